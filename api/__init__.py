@@ -5,12 +5,14 @@ from __future__ import absolute_import
 from .model import Model
 from .channel import (Channel, ProductionChannel, DecayChannel,
                       format_pythia_string)
+from .context import EvaluationContext
 from .active_processes import ActiveProcesses
+from .width_cache import WidthCache
 from .branching_ratios import (BranchingRatios, DecayBranchingRatios,
                                ProductionBranchingRatios, BranchingRatiosResult,
                                format_pythia_particle_string)
 
 __all__ = ['Model', 'Channel', 'ProductionChannel', 'DecayChannel',
-           'ActiveProcesses', 'BranchingRatios', 'DecayBranchingRatios',
+           'EvaluationContext', 'ActiveProcesses', 'WidthCache', 'BranchingRatios', 'DecayBranchingRatios',
            'ProductionBranchingRatios', 'BranchingRatiosResult',
            'format_pythia_string', 'format_pythia_particle_string']
@@ -11,6 +11,12 @@ from collections import OrderedDict
 class ActiveProcesses(object):
     '''
     Represents a set of available and active processes.
+
+    The selection is stored as an integer bitmask over the list of processes,
+    where bit `i` is set if the i-th process is active. Each group of processes
+    is resolved once (including nested groups) into the bitmask of all its
+    elementary processes, such that enabling or disabling processes only
+    requires integer operations.
     '''
     def __init__(self, process_list, process_groups=dict(), default_selection=[]):
         # Shallow copy because processes are immutable
@@ -21,26 +27,65 @@ class ActiveProcesses(object):
         all_process_groups = OrderedDict((str(process), None) for process in process_list)
         all_process_groups.update(process_groups)
         all_process_groups.update({'All': self._process_dict.keys()})
-        self._all_process_groups = all_process_groups
+        self._names = list(self._process_dict.keys())
+        self._processes = list(self._process_dict.values())
+        self._masks = self._resolve_masks(all_process_groups)
+        self._all_mask = self._masks['All']
         # Active processes
-        self._active = set()
+        self._active_mask = 0
+        # Incremented whenever the set of active processes changes.
+        self._version = 0
+        # Indices of the processes in sorted order (built on first use), and
+        # sorted list of active processes for the last selection.
+        self._sorted_indices = None
+        self._sorted_active = (None, [])
         for proc in default_selection:
             self.enable(proc)
 
-    def _get_subprocesses(self, process):
+    def _resolve_masks(self, all_process_groups):
+        'Computes the bitmask of every elementary process and group.'
+        index = dict((name, i) for i, name in enumerate(self._names))
+        masks = {}
+        def resolve(process, parents):
+            try:
+                return masks[process]
+            except KeyError:
+                pass
+            try:
+                subprocesses = all_process_groups[process]
+            except KeyError:
+                raise(ValueError("Process '{}' not available.".format(process)))
+            if subprocesses is None: # Elementary process
+                mask = 1 << index[process]
+            else:
+                if process in parents:
+                    raise(ValueError("Group '{}' contains itself.".format(process)))
+                mask = 0
+                for subproc in subprocesses:
+                    mask |= resolve(subproc, parents + [process])
+            masks[process] = mask
+            return mask
+        for process in all_process_groups:
+            resolve(process, [])
+        return masks
+
+    def _get_mask(self, process):
         try:
-            return self._all_process_groups[process]
+            return self._masks[process]
         except KeyError:
             raise(ValueError("Process '{}' not available.".format(process)))
 
+    def _set_mask(self, mask):
+        if mask != self._active_mask:
+            self._active_mask = mask
+            self._version += 1
+
+    def _names_in(self, mask):
+        return [name for i, name in enumerate(self._names) if mask >> i & 1]
+
     def enable(self, process):
         'Enable one process or group.'
-        subprocesses = self._get_subprocesses(process)
-        if subprocesses is None: # Elementary process
-            self._active.add(process)
-        else: # Enable all subprocesses
-            for subproc in subprocesses:
-                self.enable(subproc)
+        self._set_mask(self._active_mask | self._get_mask(process))
 
     def disable(self, process):
         '''
@@ -48,24 +93,44 @@ class ActiveProcesses(object):
 
         If the process or group is already disabled, do nothing.
         '''
-        subprocesses = self._get_subprocesses(process)
-        if subprocesses is None: # Elementary process
-            self._active.discard(process)
-        else: # Disable all subprocesses
-            for subproc in subprocesses:
-                self.disable(subproc)
+        self._set_mask(self._active_mask & ~self._get_mask(process))
 
     def enable_all(self):
         'Enable all processes.'
-        self._active = set(self._process_dict.keys())
+        self._set_mask(self._all_mask)
 
     def disable_all(self):
         'Disable all processes.'
-        self._active = set()
+        self._set_mask(0)
+
+    @property
+    def version(self):
+        '''
+        Counter which is incremented whenever the set of active processes
+        changes, e.g. to invalidate results computed for a previous selection.
+        '''
+        return self._version
+
+    @property
+    def selection_mask(self):
+        '''
+        Bitmask of the active processes, where bit `i` corresponds to the i-th
+        process of `list_available()`. It can be used as a cheap, hashable key
+        for the current selection.
+        '''
+        return self._active_mask
+
+    def get_mask(self, process):
+        'Return the bitmask of all the elementary processes in a process or group.'
+        return self._get_mask(process)
 
     def list_enabled(self):
         'List all enabled processes.'
-        return list(self._active)
+        return self._names_in(self._active_mask)
+
+    def enabled_set(self):
+        'Return the set of enabled processes as a `frozenset`.'
+        return frozenset(self.list_enabled())
 
     def list_available(self):
         'List all available processes.'
@@ -75,8 +140,26 @@ class ActiveProcesses(object):
         'List all available groups of processes.'
         return list(self._process_groups)
 
+    def get_processes(self, mask):
+        '''
+        Return the sorted `Channel` objects for all processes in the bitmask
+        `mask` (see `get_mask`), whether they are active or not.
+        '''
+        if self._sorted_indices is None:
+            self._sorted_indices = sorted(range(len(self._processes)),
+                                          key=lambda i: self._processes[i])
+        return [self._processes[i] for i in self._sorted_indices if mask >> i & 1]
+
     def get_active_processes(self):
-        'Return the `Channel` objects for all active processes.'
-        lst = [self._process_dict[ch] for ch in self._active]
-        lst.sort()
-        return lst
+        '''
+        Return the `Channel` objects for all active processes.
+
+        All processes are sorted once, and the sorted list of active processes
+        is cached until the selection changes.
+        '''
+        mask, lst = self._sorted_active
+        if mask != self._active_mask:
+            mask = self._active_mask
+            lst = self.get_processes(mask)
+            self._sorted_active = (mask, lst)
+        return list(lst)
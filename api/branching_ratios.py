@@ -10,6 +10,7 @@ from collections import OrderedDict
 import numpy as np
 
 from ..api.channel import Channel
+from ..api.context import EvaluationContext
 from ..data.constants import second, c_si, default_scalar_id
 
 
@@ -26,13 +27,183 @@ def format_pythia_particle_string(
     return '\n'.join([all_prop, is_resonance, may_decay, is_visible])
 
 
+def _intersect(a, b):
+    'Intersection of two masks, where None is a mask which is true everywhere.'
+    if a is None or b is None:
+        return b if a is None else a
+    return a & b
+
+def _get_domain(channel, mass, enabled=None):
+    """
+    Returns the masks of the masses where the width of the channel is not NaN,
+    and where its normalized width must be evaluated (i.e. where it is valid,
+    open and enabled), or None instead of a mask which is true for all masses.
+
+    `enabled` is an optional mask of the masses where the channel is enabled.
+    Its width is 0 elsewhere, even where the channel is invalid.
+    """
+    def contains(interval):
+        if interval is None:
+            return None
+        mask = interval.contains(mass)
+        return None if mask.all() else mask
+    valid = contains(channel.validity_interval)
+    needed = _intersect(_intersect(valid, contains(channel.open_interval)), enabled)
+    if valid is not None and enabled is not None:
+        valid = valid | ~enabled
+    return valid, needed
+
+def _evaluate_kernels(channel_type, channels, mass, context, enabled=None):
+    """
+    Evaluates the normalized widths of the channels (all of type
+    `channel_type`) together, only for the masses where at least one of them
+    is valid, open and enabled (`enabled` is an optional list of masks, with
+    one mask or None for each channel). The width of each channel is then
+    directly set to NaN where it is invalid, and to 0 where it is closed or
+    disabled.
+    """
+    if enabled is None:
+        enabled = len(channels) * [None]
+    domains = [_get_domain(ch, mass, mask) for ch, mask in zip(channels, enabled)]
+    evaluated = [i for i, (_, needed) in enumerate(domains)
+                 if needed is None or np.any(needed)]
+    if any(domains[i][1] is None for i in evaluated):
+        where = None
+    else:
+        where = np.zeros(mass.shape, dtype='bool')
+        for i in evaluated:
+            where |= domains[i][1]
+    values = {}
+    if evaluated:
+        batch = [channels[i] for i in evaluated]
+        if where is None:
+            values = channel_type.normalized_widths(batch, mass, context)
+        else:
+            values = channel_type.normalized_widths(batch, mass[where], context.restrict(where))
+        values = dict(zip(evaluated, values))
+    widths = []
+    for i, (valid, needed) in enumerate(domains):
+        if i not in values:
+            w = np.zeros(mass.shape)
+        elif where is None:
+            w = values[i]
+            if needed is None:
+                widths.append(w)
+                continue
+            w = np.array(w, dtype='float')
+        else:
+            w = np.empty(mass.shape)
+            w[where] = values[i]
+        if needed is not None:
+            w[~needed] = 0.
+        if valid is not None:
+            w[~valid] = float('nan')
+        widths.append(w)
+    return widths
+
+def _compute_widths(channels, mass, couplings, width_cache=None, enabled=None):
+    """
+    Computes the widths of all the channels.
+
+    The normalized width is only evaluated once for each distinct kernel (see
+    `Channel.kernel_key`), and then multiplied by the coupling factor of each
+    channel. The kernels are evaluated together for each type of channel (see
+    `Channel.normalized_widths`), and all channels share the same
+    `EvaluationContext`. Each type of channel is only evaluated for the masses
+    where at least one kernel is valid and open (see `Channel.validity_interval`
+    and `Channel.open_interval`).
+
+    If `width_cache` (a `WidthCache`) is given, the normalized widths are
+    looked up in it first, and the missing ones are stored after evaluation.
+
+    `enabled` is an optional dictionary mapping channel strings to boolean
+    masks (broadcastable to `mass`) of the masses where each channel is
+    enabled. The width of a channel is 0 for the other masses, where it is not
+    evaluated. Channels missing from the dictionary are enabled everywhere.
+
+    Duplicate masses (e.g. from `np.meshgrid`) are only evaluated once: the
+    normalized widths are computed for the unique masses, scattered back to
+    the shape of `mass`, and only then multiplied by the coupling factors.
+    """
+    mass = np.asarray(mass, dtype='float')
+    unique_mass, inverse = mass, None
+    if mass.size > 1:
+        values, indices = np.unique(mass, return_inverse=True)
+        if values.size < mass.size:
+            unique_mass, inverse = values, indices.reshape(mass.shape)
+    def to_unique(mask):
+        'Mask of the unique masses which are enabled for at least one duplicate.'
+        if mask is None or inverse is None:
+            return mask
+        unique_mask = np.zeros(unique_mass.shape, dtype='bool')
+        unique_mask[inverse[mask]] = True
+        return None if unique_mask.all() else unique_mask
+    context = EvaluationContext(unique_mass)
+    # Channels without a kernel key are their own key.
+    keys = []
+    for ch in channels:
+        key = ch.kernel_key
+        keys.append(ch if key is None else key)
+    # Masks of the masses where each channel and each (unique) kernel are
+    # enabled, where None means all masses.
+    channel_masks = []
+    kernel_masks = {}
+    for key, ch in zip(keys, channels):
+        mask = None if enabled is None else enabled.get(str(ch))
+        if mask is not None:
+            mask = np.broadcast_to(np.asarray(mask, dtype='bool'), mass.shape)
+            if mask.all():
+                mask = None
+        channel_masks.append(mask)
+        if key not in kernel_masks:
+            kernel_masks[key] = mask
+        elif kernel_masks[key] is not None:
+            kernel_masks[key] = None if mask is None else kernel_masks[key] | mask
+    kernel_masks = dict((key, to_unique(mask)) for key, mask in viewitems(kernel_masks))
+    kernels = {}
+    groups = OrderedDict()
+    for key, ch in zip(keys, channels):
+        if key in kernels:
+            continue
+        if width_cache is not None and key is not ch:
+            try:
+                kernels[key] = width_cache.lookup(key, unique_mass)
+                continue
+            except KeyError:
+                pass
+        groups.setdefault(type(ch), OrderedDict()).setdefault(key, ch)
+    for channel_type, group in viewitems(groups):
+        normalized_widths = _evaluate_kernels(
+            channel_type, list(group.values()), context.mass, context,
+            [kernel_masks[key] for key in group.keys()])
+        for key, ch, normalized_width in zip(group.keys(), group.values(), normalized_widths):
+            kernels[key] = normalized_width
+            # Only complete widths are cached.
+            if width_cache is not None and key is not ch and kernel_masks[key] is None:
+                width_cache.insert(key, unique_mass, normalized_width)
+    widths = OrderedDict()
+    for key, ch, mask in zip(keys, channels, channel_masks):
+        normalized_width = kernels[key]
+        if inverse is not None:
+            normalized_width = normalized_width[inverse]
+        if mask is not None:
+            normalized_width = np.where(mask, normalized_width, 0.)
+        widths[str(ch)] = ch.coupling_factor(couplings) * normalized_width
+    return widths
+
+
 class BranchingRatios(with_metaclass(abc.ABCMeta, object)):
     '''
     Represents a set of computed branching ratios.
+
+    If `enabled` is given, each channel is only enabled for some of the masses,
+    and its width is 0 for the other ones (see `_compute_widths`).
     '''
     def __init__(self, channels, mass, couplings,
                  ignore_invalid=False,
-                 scalar_id=default_scalar_id):
+                 scalar_id=default_scalar_id,
+                 width_cache=None,
+                 enabled=None):
         self._channels = OrderedDict((str(ch), ch) for ch in channels)
         self._mS = np.asarray(mass, dtype='float')
         try:
@@ -46,7 +217,12 @@ class BranchingRatios(with_metaclass(abc.ABCMeta, object)):
             raise(ValueError('Mass and coupling arrays could not be broadcast together.'))
         self._ndim = bc.nd
         self._scalar_id = scalar_id
-        self._widths = OrderedDict((str(ch), ch.width(mass, self._couplings)) for ch in channels)
+        # Channels only depend on one of the couplings, so we broadcast their
+        # widths to the full shape of the result.
+        self._widths = OrderedDict(
+            (ch_str, np.array(np.broadcast_to(w, bc.shape)))
+            for ch_str, w in viewitems(_compute_widths(
+                channels, mass, self._couplings, width_cache, enabled)))
         if ignore_invalid:
             for w in self._widths.values():
                 w[np.isnan(w)] = 0
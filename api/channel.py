@@ -3,6 +3,7 @@
 from __future__ import absolute_import
 from future.utils import with_metaclass
 import abc # Abstract Base Classes
+from collections import namedtuple
 
 from ..data.particles import *
 
@@ -30,6 +31,43 @@ def format_pythia_string(parent_id, children_ids, branching_ratio, matrix_elemen
         parent_id, branching_ratio, matrix_element,
         ' '.join(str(child_id) for child_id in children_ids))
 
+_closed_kinds = ['left', 'right', 'both', 'neither']
+
+class Interval(namedtuple('Interval', ['lower', 'upper', 'closed'])):
+    '''
+    Interval of scalar masses between `lower` and `upper` (which can be
+    infinite). `closed` specifies which bounds belong to the interval: 'left',
+    'right', 'both' or 'neither'.
+    '''
+    __slots__ = ()
+
+    def __new__(cls, lower=-float('inf'), upper=float('inf'), closed='neither'):
+        if closed not in _closed_kinds:
+            raise(ValueError("'closed' must be one of {}.".format(', '.join(_closed_kinds))))
+        return super(Interval, cls).__new__(cls, float(lower), float(upper), closed)
+
+    def contains(self, mS):
+        '''
+        Returns whether each mass is in the interval. Infinite bounds are not
+        checked, such that NaN masses are only in the unbounded interval.
+        '''
+        mS = np.asarray(mS, dtype='float')
+        inside = None
+        if self.lower > -float('inf'):
+            if self.closed in ['left', 'both']:
+                inside = mS >= self.lower
+            else:
+                inside = mS > self.lower
+        if self.upper < float('inf'):
+            if self.closed in ['right', 'both']:
+                below = mS <= self.upper
+            else:
+                below = mS < self.upper
+            inside = below if inside is None else inside & below
+        if inside is None:
+            inside = np.ones(mS.shape, dtype='bool')
+        return inside
+
 def _safe_get_pdg_id(particle):
     '''
     If the PDG code of the particle is known, return it. Otherwise, make a new
@@ -51,17 +89,28 @@ class Channel(with_metaclass(abc.ABCMeta, object)):
         self._children = children
         self._coefficient = coefficient
         self._str = _to_channel_str(parent, children)
+        self._pdg_ids = None
 
     def __str__(self):
         return _to_channel_str(self._parent, self._children)
 
+    def _get_pdg_ids(self):
+        'PDG codes of the parent and children, looked up once and used for sorting.'
+        if self._pdg_ids is None:
+            self._pdg_ids = ( _safe_get_pdg_id(self._parent),
+                              [_safe_get_pdg_id(child) for child in self._children] )
+        return self._pdg_ids
+
     def __lt__(self, other):
+        parent_id, children_ids = self._get_pdg_ids()
+        other_parent_id, other_children_ids = other._get_pdg_ids()
         if self._parent != other._parent:
-            return _safe_get_pdg_id(self._parent) < _safe_get_pdg_id(other._parent)
+            return parent_id < other_parent_id
         else:
-            for child, other_child in zip(self._children, other._children):
+            for child, other_child, child_id, other_child_id in zip(
+                    self._children, other._children, children_ids, other_children_ids):
                 if child != other_child:
-                    return _safe_get_pdg_id(child) < _safe_get_pdg_id(other_child)
+                    return child_id < other_child_id
         return False # a == b, so a < b returns False
 
     @abc.abstractmethod
@@ -82,22 +131,81 @@ class Channel(with_metaclass(abc.ABCMeta, object)):
         '''
         return np.isfinite(self.normalized_width(mS))
 
+    @property
+    def validity_interval(self):
+        '''
+        `Interval` of masses outside of which `normalized_width` returns NaN,
+        or None if it is valid for all masses.
+
+        This metadata is used to only evaluate the width where it is needed when
+        computing branching ratios, and must exactly match the behaviour of
+        `normalized_width`.
+        '''
+        return None
+
+    @property
+    def open_interval(self):
+        '''
+        `Interval` of masses outside of which `normalized_width` returns 0
+        (where it is valid), e.g. because the channel is kinematically closed,
+        or None if unknown.
+
+        Like `validity_interval`, it must exactly match the behaviour of
+        `normalized_width`.
+        '''
+        return None
+
     @abc.abstractmethod
-    def normalized_width(self, mS):
+    def normalized_width(self, mS, context=None):
         '''
         Returns the width for this channel, assuming unit couplings.
+
+        `context` is an optional `EvaluationContext` for the same masses `mS`,
+        which is shared between channels to avoid recomputing common
+        quantities (e.g. the running of α_s).
         '''
         pass # pragma: no cover
 
-    def width(self, mS, couplings):
+    @classmethod
+    def normalized_widths(cls, channels, mS, context=None):
         '''
-        Returns the width for this channel for arbitrary couplings.
+        Returns the list of the normalized widths of several channels of this
+        type, evaluated for the same masses.
+
+        The default implementation evaluates the channels one by one. It can be
+        overridden to evaluate them together more efficiently.
+        '''
+        return [ch.normalized_width(mS, context) for ch in channels]
+
+    @property
+    def kernel_key(self):
+        '''
+        Hashable key identifying the function computed by `normalized_width`.
+
+        Channels sharing the same key (e.g. B+ -> S K+ and B0 -> S K0, which
+        only depend on the QCD states B and K) have identical normalized
+        widths, which are then only computed once when evaluating several
+        channels together. The default value `None` means that the normalized
+        width is not shared with any other channel.
+        '''
+        return None
+
+    def coupling_factor(self, couplings):
+        '''
+        Returns the factor relating the normalized width to the width for
+        arbitrary couplings.
 
         The default implementation assumes quadratic scaling. It should be
         overridden if this is not the case.
         '''
         c = couplings[self._coefficient]
-        return c**2 * self.normalized_width(mS)
+        return c**2
+
+    def width(self, mS, couplings):
+        '''
+        Returns the width for this channel for arbitrary couplings.
+        '''
+        return self.coupling_factor(couplings) * self.normalized_width(mS)
 
     @abc.abstractmethod
     def pythia_string(self, branching_ratio, scalar_id):
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import numpy as np
+
+
+class EvaluationContext(object):
+    '''
+    Memoizes quantities derived from a fixed array of scalar masses, such as
+    the running of α_s or of the quark masses.
+
+    A single context is shared by all the channels evaluated during the same
+    computation (see `Channel.normalized_width`), so that quantities required
+    by several channels are only computed once for each mass.
+    '''
+    def __init__(self, mS):
+        self._mS = np.asarray(mS, dtype='float')
+        self._values = {}
+
+    @property
+    def mass(self):
+        'The scalar masses for which quantities are evaluated.'
+        return self._mS
+
+    def check_mass(self, mS):
+        '''
+        Raises `ValueError` if `mS` are not the masses of this context, e.g.
+        when a function is called with a context created for other masses.
+        '''
+        mS = np.asarray(mS, dtype='float')
+        if mS is self._mS:
+            return
+        if mS.shape != self._mS.shape:
+            raise(ValueError('The masses of shape {} do not match the context (of shape {}).'.format(
+                mS.shape, self._mS.shape)))
+        with np.errstate(invalid='ignore'):
+            same = (mS == self._mS) | (np.isnan(mS) & np.isnan(self._mS))
+        if not np.all(same):
+            raise(ValueError('The masses do not match the ones of the context.'))
+
+    def memoize(self, key, func, where=None):
+        '''
+        Returns `func(mS[where])`, where `func` must be an element-wise function
+        of the mass, uniquely identified by the hashable `key`.
+
+        `func` is only called for the masses for which it has not already been
+        computed, possibly with a different `where` mask. If `where` is None,
+        the result is returned for all masses.
+        '''
+        if where is None:
+            where = np.ones(self._mS.shape, dtype='bool')
+        else:
+            where = np.broadcast_to(where, self._mS.shape)
+        try:
+            values, done = self._values[key]
+        except KeyError:
+            values, done = None, np.zeros(self._mS.shape, dtype='bool')
+        todo = where & ~done
+        if np.any(todo):
+            new_values = np.asarray(func(self._mS[todo]))
+            if values is None:
+                values = np.empty(self._mS.shape, dtype=new_values.dtype)
+            values[todo] = new_values
+            done = done | todo
+            self._values[key] = (values, done)
+        if values is None: # `where` is empty
+            return np.asarray(func(self._mS[where]))
+        return values[where]
+
+    def restrict(self, where):
+        '''
+        Returns a context for the masses `mS[where]` (as a flat array), which
+        shares its memoized quantities with this context.
+        '''
+        return _RestrictedContext(self, where)
+
+
+class _RestrictedContext(EvaluationContext):
+    'Context for a subset of the masses of another context.'
+    def __init__(self, parent, where):
+        self._parent = parent
+        self._where = np.broadcast_to(where, parent.mass.shape)
+        self._mS = parent.mass[self._where]
+
+    def memoize(self, key, func, where=None):
+        parent_where = np.zeros(self._where.shape, dtype='bool')
+        if where is None:
+            parent_where[self._where] = True
+        else:
+            parent_where[self._where] = np.broadcast_to(where, self._mS.shape)
+        return self._parent.memoize(key, func, parent_where)
@@ -2,79 +2,96 @@
 
 from __future__ import absolute_import, division
 
+import hashlib
 import numpy as np
 
 from ..api.active_processes import ActiveProcesses
 from ..api.branching_ratios import *
+from ..api.width_cache import get_inputs_fingerprint
 from ..data.constants import default_scalar_id
-from ..production.two_body_hadronic import TwoBodyHadronic
-from ..production.two_body_quartic import TwoBodyQuartic
-from ..production.three_body_quartic import ThreeBodyQuartic
-from ..decay.leptonic import Leptonic
-from ..decay.two_pions import TwoPions
-from ..decay.two_kaons import TwoKaons
-from ..decay.multimeson import Multimeson
-from ..decay.two_gluons import TwoGluons
-from ..decay.two_quarks import TwoQuarks
-
-
-# All supported production channels
-_production_channels = [
-    # Kaon decays
-    # * Two-body decays through mixing with the SM Higgs
-    TwoBodyHadronic('K+'  , 'pi+'),
-    TwoBodyHadronic('K_L0', 'pi0', weak_eigenstate='K0'),
-    TwoBodyHadronic('K_S0', 'pi0', weak_eigenstate='K0'),
-    # * Two-body decays through the quartic interaction
-    TwoBodyQuartic('K_L0', weak_eigenstate='K0'),
-    TwoBodyQuartic('K_S0', weak_eigenstate='K0'),
-    # B meson decays
-    # * Two-body decays through mixing with the SM Higgs
-    TwoBodyHadronic('B+', 'pi+'        ),
-    TwoBodyHadronic('B0', 'pi0'        ),
-    TwoBodyHadronic('B+', 'K+'         ),
-    TwoBodyHadronic('B0', 'K0'         ), # Final-state mixing handled by PYTHIA
-    TwoBodyHadronic('B+', 'K*+'        ),
-    TwoBodyHadronic('B0', 'K*0'        ),
-    TwoBodyHadronic('B+', 'K*(1410)+'  ),
-    TwoBodyHadronic('B0', 'K*(1410)0'  ),
-    TwoBodyHadronic('B+', 'K*(1680)+'  ),
-    TwoBodyHadronic('B0', 'K*(1680)0'  ),
-    TwoBodyHadronic('B+', 'K_1(1270)+' ),
-    TwoBodyHadronic('B0', 'K_1(1270)0' ),
-    TwoBodyHadronic('B+', 'K_1(1400)+' ),
-    TwoBodyHadronic('B0', 'K_1(1400)0' ),
-    TwoBodyHadronic('B+', 'K*_0(700)+' ),
-    TwoBodyHadronic('B0', 'K*_0(700)0' ),
-    TwoBodyHadronic('B+', 'K*_0(1430)+'),
-    TwoBodyHadronic('B0', 'K*_0(1430)0'),
-    TwoBodyHadronic('B+', 'K*_2(1430)+'),
-    TwoBodyHadronic('B0', 'K*_2(1430)0'),
-    # * Two-body decays through the quartic interaction
-    TwoBodyQuartic('B0'  ),
-    TwoBodyQuartic('B_s0'),
-    # * Three-body decays through the quartic interaction
-    ThreeBodyQuartic('B+', 'pi+'        ),
-    ThreeBodyQuartic('B0', 'pi0'        ),
-    ThreeBodyQuartic('B+', 'K+'         ),
-    ThreeBodyQuartic('B0', 'K0'         ), # Final-state mixing handled by PYTHIA
-    ThreeBodyQuartic('B+', 'K*+'        ),
-    ThreeBodyQuartic('B0', 'K*0'        ),
-    ThreeBodyQuartic('B+', 'K*(1410)+'  ),
-    ThreeBodyQuartic('B0', 'K*(1410)0'  ),
-    ThreeBodyQuartic('B+', 'K*(1680)+'  ),
-    ThreeBodyQuartic('B0', 'K*(1680)0'  ),
-    ThreeBodyQuartic('B+', 'K_1(1270)+' ),
-    ThreeBodyQuartic('B0', 'K_1(1270)0' ),
-    ThreeBodyQuartic('B+', 'K_1(1400)+' ),
-    ThreeBodyQuartic('B0', 'K_1(1400)0' ),
-    ThreeBodyQuartic('B+', 'K*_0(700)+' ),
-    ThreeBodyQuartic('B0', 'K*_0(700)0' ),
-    ThreeBodyQuartic('B+', 'K*_0(1430)+'),
-    ThreeBodyQuartic('B0', 'K*_0(1430)0'),
-    ThreeBodyQuartic('B+', 'K*_2(1430)+'),
-    ThreeBodyQuartic('B0', 'K*_2(1430)0'),
-]
+from ..data.lru_cache import LRUCache
+
+
+# The channels are only instantiated (and their modules imported) when the first
+# `Model` is created, since this requires loading the particle data and the
+# decay width tables, which makes `import scalar_portal` slow.
+_production_channels = None
+_decay_channels = None
+
+def _get_production_channels():
+    'All supported production channels.'
+    global _production_channels
+    if _production_channels is None:
+        _production_channels = _make_production_channels()
+    return _production_channels
+
+def _get_decay_channels():
+    'All supported decay channels.'
+    global _decay_channels
+    if _decay_channels is None:
+        _decay_channels = _make_decay_channels()
+    return _decay_channels
+
+def _make_production_channels():
+    from ..production.two_body_hadronic import TwoBodyHadronic
+    from ..production.two_body_quartic import TwoBodyQuartic
+    from ..production.three_body_quartic import ThreeBodyQuartic
+    return [
+        # Kaon decays
+        # * Two-body decays through mixing with the SM Higgs
+        TwoBodyHadronic('K+'  , 'pi+'),
+        TwoBodyHadronic('K_L0', 'pi0', weak_eigenstate='K0'),
+        TwoBodyHadronic('K_S0', 'pi0', weak_eigenstate='K0'),
+        # * Two-body decays through the quartic interaction
+        TwoBodyQuartic('K_L0', weak_eigenstate='K0'),
+        TwoBodyQuartic('K_S0', weak_eigenstate='K0'),
+        # B meson decays
+        # * Two-body decays through mixing with the SM Higgs
+        TwoBodyHadronic('B+', 'pi+'        ),
+        TwoBodyHadronic('B0', 'pi0'        ),
+        TwoBodyHadronic('B+', 'K+'         ),
+        TwoBodyHadronic('B0', 'K0'         ), # Final-state mixing handled by PYTHIA
+        TwoBodyHadronic('B+', 'K*+'        ),
+        TwoBodyHadronic('B0', 'K*0'        ),
+        TwoBodyHadronic('B+', 'K*(1410)+'  ),
+        TwoBodyHadronic('B0', 'K*(1410)0'  ),
+        TwoBodyHadronic('B+', 'K*(1680)+'  ),
+        TwoBodyHadronic('B0', 'K*(1680)0'  ),
+        TwoBodyHadronic('B+', 'K_1(1270)+' ),
+        TwoBodyHadronic('B0', 'K_1(1270)0' ),
+        TwoBodyHadronic('B+', 'K_1(1400)+' ),
+        TwoBodyHadronic('B0', 'K_1(1400)0' ),
+        TwoBodyHadronic('B+', 'K*_0(700)+' ),
+        TwoBodyHadronic('B0', 'K*_0(700)0' ),
+        TwoBodyHadronic('B+', 'K*_0(1430)+'),
+        TwoBodyHadronic('B0', 'K*_0(1430)0'),
+        TwoBodyHadronic('B+', 'K*_2(1430)+'),
+        TwoBodyHadronic('B0', 'K*_2(1430)0'),
+        # * Two-body decays through the quartic interaction
+        TwoBodyQuartic('B0'  ),
+        TwoBodyQuartic('B_s0'),
+        # * Three-body decays through the quartic interaction
+        ThreeBodyQuartic('B+', 'pi+'        ),
+        ThreeBodyQuartic('B0', 'pi0'        ),
+        ThreeBodyQuartic('B+', 'K+'         ),
+        ThreeBodyQuartic('B0', 'K0'         ), # Final-state mixing handled by PYTHIA
+        ThreeBodyQuartic('B+', 'K*+'        ),
+        ThreeBodyQuartic('B0', 'K*0'        ),
+        ThreeBodyQuartic('B+', 'K*(1410)+'  ),
+        ThreeBodyQuartic('B0', 'K*(1410)0'  ),
+        ThreeBodyQuartic('B+', 'K*(1680)+'  ),
+        ThreeBodyQuartic('B0', 'K*(1680)0'  ),
+        ThreeBodyQuartic('B+', 'K_1(1270)+' ),
+        ThreeBodyQuartic('B0', 'K_1(1270)0' ),
+        ThreeBodyQuartic('B+', 'K_1(1400)+' ),
+        ThreeBodyQuartic('B0', 'K_1(1400)0' ),
+        ThreeBodyQuartic('B+', 'K*_0(700)+' ),
+        ThreeBodyQuartic('B0', 'K*_0(700)0' ),
+        ThreeBodyQuartic('B+', 'K*_0(1430)+'),
+        ThreeBodyQuartic('B0', 'K*_0(1430)0'),
+        ThreeBodyQuartic('B+', 'K*_2(1430)+'),
+        ThreeBodyQuartic('B0', 'K*_2(1430)0'),
+    ]
 
 _production_groups = {
     # Kaon decays
@@ -181,20 +198,26 @@ _production_groups = {
     ]
 }
 
-# All supported decay channels
-_decay_channels = [
-    Leptonic('e'),       # S -> e+ e-
-    Leptonic('mu'),      # S -> mu+ mu-
-    Leptonic('tau'),     # S -> tau+ tau-
-    TwoPions('neutral'), # S -> pi0 pi0
-    TwoPions('charged'), # S -> pi+ pi-
-    TwoKaons('neutral'), # S -> K0 Kbar0
-    TwoKaons('charged'), # S -> K+ K-
-    Multimeson(),        # S -> 4π, ηη, ρρ, …
-    TwoGluons(),         # S -> g g
-    TwoQuarks('s'),      # S -> s sbar
-    TwoQuarks('c'),      # S -> c cbar
-]
+def _make_decay_channels():
+    from ..decay.leptonic import Leptonic
+    from ..decay.two_pions import TwoPions
+    from ..decay.two_kaons import TwoKaons
+    from ..decay.multimeson import Multimeson
+    from ..decay.two_gluons import TwoGluons
+    from ..decay.two_quarks import TwoQuarks
+    return [
+        Leptonic('e'),       # S -> e+ e-
+        Leptonic('mu'),      # S -> mu+ mu-
+        Leptonic('tau'),     # S -> tau+ tau-
+        TwoPions('neutral'), # S -> pi0 pi0
+        TwoPions('charged'), # S -> pi+ pi-
+        TwoKaons('neutral'), # S -> K0 Kbar0
+        TwoKaons('charged'), # S -> K+ K-
+        Multimeson(),        # S -> 4π, ηη, ρρ, …
+        TwoGluons(),         # S -> g g
+        TwoQuarks('s'),      # S -> s sbar
+        TwoQuarks('c'),      # S -> c cbar
+    ]
 
 _decay_groups = {
     # Leptonic decays
@@ -215,6 +238,21 @@ _decay_groups = {
 }
 
 
+# Decay modes of `Model`:
+#   'manual': the enabled decay channels are used for all masses;
+#   'auto'  : for each mass, only the channels of the regime which applies
+#             there are used, i.e. the 'LightScalar' channels up to the
+#             matching scale Λ_S^pert = 2 GeV of the multimeson model, and the
+#             'HeavyScalar' channels above it (regardless of the selection of
+#             decay channels).
+decay_modes = ['manual', 'auto']
+
+def _get_regime_boundary():
+    'Mass separating the light and heavy scalar regimes.'
+    from ..decay.multimeson import _Lambda_S_pert
+    return _Lambda_S_pert
+
+
 class Model(object):
     '''
     Phenomenological model of a GeV-scale Higgs-like scalar particle.
@@ -229,11 +267,30 @@ class Model(object):
         Ovchynnikov, M., Sokolenko, A., 2019.
         Phenomenology of GeV-scale scalar portal.
         arXiv:1904.10447 [hep-ex, physics:hep-ph].
+
+    If `width_cache` (a `WidthCache`) is given, the normalized widths are
+    persistently cached on disk and reused across runs.
+
+    If `memo_size` is positive, the results of `compute_branching_ratios` are
+    memoized in memory for the `memo_size` most recently used arguments (or
+    without bound if it is None). The memo is cleared whenever the selection of
+    production or decay channels changes, and results computed with other
+    numerical constants or another QCD backend are not reused. Memoized
+    results are shared between calls, and should therefore not be modified.
+
+    `decay_mode` selects how the decay channels are chosen (see `decay_modes`).
+    In the 'auto' mode, masses on both sides of 2 GeV can be computed at once,
+    with a total width which is continuous across the boundary.
     '''
-    def __init__(self, scalar_id=default_scalar_id):
-        self._production = ActiveProcesses(_production_channels, _production_groups)
-        self._decay = ActiveProcesses(_decay_channels, _decay_groups)
+    def __init__(self, scalar_id=default_scalar_id, width_cache=None, memo_size=0,
+                 decay_mode='manual'):
+        self._production = ActiveProcesses(_get_production_channels(), _production_groups)
+        self._decay = ActiveProcesses(_get_decay_channels(), _decay_groups)
+        self.decay_mode = decay_mode
         self._scalar_id = scalar_id
+        self._width_cache = width_cache
+        self._memo = LRUCache(memo_size)
+        self._memo_versions = None
 
     @property
     def production(self):
@@ -250,6 +307,23 @@ class Model(object):
         'The PDG ID for the scalar particle.'
         return self._scalar_id
 
+    @property
+    def decay_mode(self):
+        "How the decay channels are chosen: 'manual' or 'auto' (see `decay_modes`)."
+        return self._decay_mode
+
+    @decay_mode.setter
+    def decay_mode(self, mode):
+        if mode not in decay_modes:
+            raise(ValueError("Unknown decay mode '{}' (must be one of {}).".format(
+                mode, ', '.join(decay_modes))))
+        self._decay_mode = mode
+
+    @property
+    def width_cache(self):
+        'The on-disk cache for the widths, or None.'
+        return self._width_cache
+
     def compute_branching_ratios(self, mass, couplings=None, ignore_invalid=False, **kwargs):
         '''
         Compute the production and decay branching ratios of the scalar
@@ -258,11 +332,110 @@ class Model(object):
         '''
         if couplings is None:
             couplings = kwargs
+        if self._memo.maxsize == 0:
+            return self._compute_branching_ratios(mass, couplings, ignore_invalid)
+        versions = (self._production.version, self._decay.version)
+        if versions != self._memo_versions:
+            self._memo.clear()
+            self._memo_versions = versions
+        try:
+            key = self._memo_key(mass, couplings, ignore_invalid)
+        except AttributeError: # Invalid couplings, let the computation fail
+            return self._compute_branching_ratios(mass, couplings, ignore_invalid)
+        return self._memo.get_or_compute(
+            key, lambda: self._compute_branching_ratios(mass, couplings, ignore_invalid))
+
+    def _memo_key(self, mass, couplings, ignore_invalid):
+        def array_key(a):
+            a = np.ascontiguousarray(a, dtype='float')
+            return (a.shape, hashlib.sha1(a.tobytes()).hexdigest())
+        return (array_key(mass),
+                tuple(sorted((name, array_key(c)) for name, c in couplings.items())),
+                self._production.selection_mask, self._decay.selection_mask,
+                self._decay_mode, bool(ignore_invalid), self._scalar_id,
+                get_inputs_fingerprint())
+
+    def memo_info(self):
+        'Statistics of the memo of `compute_branching_ratios` (see `LRUCache.info`).'
+        return self._memo.info()
+
+    def clear_memo(self):
+        'Clears the memo of `compute_branching_ratios`.'
+        self._memo.clear()
+
+    def _get_auto_decay_channels(self, mass):
+        '''
+        Returns the decay channels of the regimes which apply to the masses,
+        and the masks of the masses where each of them is enabled.
+        '''
+        light = np.asarray(mass, dtype='float') <= _get_regime_boundary()
+        # NaN masses are assigned to the heavy regime, where they remain invalid.
+        regimes = [(self._decay.get_mask('LightScalar'), light),
+                   (self._decay.get_mask('HeavyScalar'), ~light)]
+        regimes = [(group_mask, mask) for group_mask, mask in regimes if np.any(mask)]
+        enabled = {}
+        all_mask = 0
+        for group_mask, mask in regimes:
+            all_mask |= group_mask
+            for ch in self._decay.get_processes(group_mask):
+                ch_str = str(ch)
+                enabled[ch_str] = mask | enabled[ch_str] if ch_str in enabled else mask
+        channels = self._decay.get_processes(all_mask)
+        return channels, enabled
+
+    def _compute_branching_ratios(self, mass, couplings, ignore_invalid):
         prod_channels  = self.production.get_active_processes()
-        decay_channels = self.decay.get_active_processes()
+        if self._decay_mode == 'auto':
+            decay_channels, enabled = self._get_auto_decay_channels(mass)
+        else:
+            decay_channels, enabled = self.decay.get_active_processes(), None
         prod_br  = ProductionBranchingRatios(
-            prod_channels , mass, couplings, ignore_invalid, scalar_id=self._scalar_id)
+            prod_channels , mass, couplings, ignore_invalid, scalar_id=self._scalar_id,
+            width_cache=self._width_cache)
         decay_br = DecayBranchingRatios(
-            decay_channels, mass, couplings, ignore_invalid, scalar_id=self._scalar_id)
+            decay_channels, mass, couplings, ignore_invalid, scalar_id=self._scalar_id,
+            width_cache=self._width_cache, enabled=enabled)
         res = BranchingRatiosResult(prod_br, decay_br)
         return res
+
+    def scan_branching_ratios(self, mass, couplings=None, ignore_invalid=False, **kwargs):
+        '''
+        Compute the production and decay branching ratios of the scalar
+        particle on the grid spanned by the mass and the couplings, and return
+        a `BranchingRatiosResult` object containing the result.
+
+        Contrary to `compute_branching_ratios`, the mass and couplings are
+        not broadcast together. Instead, each one-dimensional array spans its
+        own axis of the result: the first axis for the mass, followed by one
+        axis for each coupling, sorted by name. Scalar arguments do not add
+        any axis. For instance, for `n` masses and `k` values of `theta`,
+        `scan_branching_ratios(mS, theta=theta, alpha=0)` returns arrays of
+        shape `(n, k)`.
+
+        Since the widths scale with the couplings, the normalized width of
+        each channel is only computed once for each mass, and then rescaled
+        for every value of the couplings.
+        '''
+        if couplings is None:
+            couplings = kwargs
+        try:
+            names = sorted(couplings.keys())
+        except AttributeError:
+            raise(ValueError("'couplings' should be a dictionary (e.g. `{'theta': 1}`)."))
+        values = [np.asarray(mass, dtype='float')] + [
+            np.asarray(couplings[name], dtype='float') for name in names]
+        if any(v.ndim > 1 for v in values):
+            raise(ValueError('The mass and couplings must be scalars or one-dimensional arrays.'))
+        # Assign an axis to each one-dimensional argument.
+        ndim = sum(v.ndim for v in values)
+        grid = []
+        axis = 0
+        for v in values:
+            shape = [1] * ndim
+            if v.ndim == 1:
+                shape[axis] = len(v)
+                axis += 1
+            grid.append(np.reshape(v, shape))
+        grid_mass = grid[0]
+        grid_couplings = dict(zip(names, grid[1:]))
+        return self.compute_branching_ratios(grid_mass, grid_couplings, ignore_invalid)
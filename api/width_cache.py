@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import os
+import hashlib
+from numbers import Number
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError: # pragma: no cover
+    fcntl = None # Not available on Windows: no locking
+
+from ..data import constants as cst
+from ..data.particles import get_qcd_backend
+from ..data.files import atomic_write
+
+
+_package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Files from which the widths are computed.
+_source_extensions = ('.py', '.dat', '.txt')
+
+_source_fingerprint = None
+
+def _get_source_fingerprint():
+    '''
+    Hash of the source files of the package (excluding the tests), which
+    plays the role of the package version.
+    '''
+    global _source_fingerprint
+    if _source_fingerprint is None:
+        h = hashlib.sha1()
+        for root, dirs, files in os.walk(_package_dir):
+            dirs[:] = sorted(d for d in dirs if d != 'test' and not d.startswith('.'))
+            for name in sorted(files):
+                if name.endswith(_source_extensions):
+                    path = os.path.join(root, name)
+                    h.update(os.path.relpath(path, _package_dir).encode())
+                    with open(path, 'rb') as f:
+                        h.update(f.read())
+        _source_fingerprint = h.hexdigest()
+    return _source_fingerprint
+
+def get_inputs_fingerprint():
+    '''
+    Global inputs of the computation which can be modified at runtime: the
+    numerical constants and the QCD backend. It is part of the keys of both
+    the `WidthCache` and the memo of `Model`.
+    '''
+    constants = sorted((name, value) for name, value in vars(cst).items()
+                       if not name.startswith('_') and isinstance(value, Number))
+    return repr((constants, get_qcd_backend()))
+
+def _to_key_string(obj):
+    'Deterministic string representation of a kernel key.'
+    if isinstance(obj, type):
+        return '{}.{}'.format(obj.__module__, obj.__name__)
+    elif isinstance(obj, (tuple, list)):
+        return '(' + ', '.join(_to_key_string(o) for o in obj) + ')'
+    else:
+        return repr(obj)
+
+
+class WidthCache(object):
+    '''
+    Persistent on-disk cache of the normalized widths of the channels, which
+    can be shared between processes and between runs.
+
+    Each entry holds the normalized width of one channel for a given mass
+    array, and is stored in its own `.npz` file in `directory`. Entries are
+    keyed by a hash of the kernel key of the channel (see
+    `Channel.kernel_key`), of the numerical constants, of the QCD backend, of
+    the source files of the package and of the mass array. Channels without a
+    kernel key are never cached. Inputs modified at runtime by other means
+    (e.g. `multimeson.set_matching_coefficient`) are not tracked.
+
+    When the total size of the entries exceeds `max_size` bytes, the least
+    recently used ones are removed. Files are written atomically, and writes
+    and evictions are serialized between processes using a lock file, such
+    that the cache can safely be used concurrently on a single node.
+    '''
+    _suffix = '.npz'
+    _lock_name = '.lock'
+
+    def __init__(self, directory, max_size=256*2**20):
+        if max_size < 0:
+            raise(ValueError('The size of the cache cannot be negative.'))
+        self._directory = directory
+        self._max_size = max_size
+        try:
+            os.makedirs(directory)
+        except OSError:
+            if not os.path.isdir(directory):
+                raise
+
+    @property
+    def directory(self):
+        return self._directory
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    def _key(self, kernel_key, mS):
+        mS = np.ascontiguousarray(mS, dtype='float')
+        h = hashlib.sha1()
+        for part in [_to_key_string(kernel_key), get_inputs_fingerprint(),
+                     _get_source_fingerprint(), repr(mS.shape)]:
+            h.update(part.encode())
+            h.update(b'\0')
+        h.update(mS.tobytes())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self._directory, key + self._suffix)
+
+    def _entries(self):
+        'Returns the list of (mtime, size, path) of all the entries.'
+        entries = []
+        for name in os.listdir(self._directory):
+            if not name.endswith(self._suffix):
+                continue
+            path = os.path.join(self._directory, name)
+            try:
+                st = os.stat(path)
+            except OSError: # Removed by another process
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _lock(self):
+        lock = open(os.path.join(self._directory, self._lock_name), 'a')
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock # Released when closed
+
+    def lookup(self, kernel_key, mS):
+        '''
+        Returns the cached normalized width for the kernel and the masses `mS`.
+
+        Raises `KeyError` if it is not in the cache.
+        '''
+        key = self._key(kernel_key, mS)
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                if str(data['key']) != key:
+                    raise(KeyError(key))
+                width = data['width']
+        except (IOError, OSError, ValueError, KeyError):
+            # Missing, removed by another process or corrupted
+            raise(KeyError(key))
+        try:
+            os.utime(path, None) # Mark as recently used
+        except OSError: # pragma: no cover
+            pass
+        return width
+
+    def insert(self, kernel_key, mS, width):
+        'Stores the normalized width, evicting the oldest entries if needed.'
+        key = self._key(kernel_key, mS)
+        width = np.asarray(width, dtype='float')
+        if width.nbytes > self._max_size:
+            return
+        with self._lock():
+            with atomic_write(self._path(key)) as f:
+                np.savez(f, key=np.array(key), width=width)
+            self._evict()
+
+    def _evict(self):
+        'Removes the least recently used entries (the lock must be held).'
+        entries = sorted(self._entries())
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total_size <= self._max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError: # pragma: no cover
+                pass
+            total_size -= size
+
+    def size(self):
+        'Total size (in bytes) of the entries.'
+        return sum(size for _, size, _ in self._entries())
+
+    def __len__(self):
+        return len(self._entries())
+
+    def clear(self):
+        'Removes all the entries.'
+        with self._lock():
+            for _, _, path in self._entries():
+                try:
+                    os.remove(path)
+                except OSError: # pragma: no cover
+                    pass
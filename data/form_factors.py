@@ -6,13 +6,30 @@ from __future__ import absolute_import
 from .constants import *
 from .particles import *
 
+from future.utils import viewitems
+
+import numpy as np
 from numpy import sqrt
 from math import sin, cos
+from collections import namedtuple, OrderedDict
 
 INF = float('inf')
 
 mB = get_mass('B+')
 
+# Form factors are represented by parameter records, with one record type for
+# each family of form factors. The `evaluate(p, q2)` function of each family is
+# element-wise in both the parameters and q², such that it can evaluate many
+# transitions at once when the fields of `p` are arrays (see `FormFactorStack`).
+# Records are callable, and then evaluate the form factor as a function of q².
+
+class _FormFactor(object):
+    'Base class for the form-factor parameter records.'
+    __slots__ = ()
+
+    def __call__(self, q2):
+        return self.evaluate(self, q2)
+
 _form_factors = {}
 
 def get_form_factor(Y, Yprime):
@@ -21,60 +38,137 @@ def get_form_factor(Y, Yprime):
     except KeyError:
         raise(ValueError('No form factor for the {} -> {} transition.'.format(Y, Yprime)))
 
+class FormFactorStack(object):
+    """
+    Evaluates several form factors at once.
+
+    The records are grouped by family, and their parameters are packed into
+    arrays along a first (transition) axis. Calling the stack with an array of
+    q² values returns an array of shape `(len(form_factors),) + q2.shape`, with
+    the same values as evaluating each form factor separately.
+
+    If `aligned` is true, the first axis of `q2` is instead the transition axis
+    (i.e. each form factor is evaluated for its own q² values), and the result
+    has the same shape as `q2`.
+    """
+    def __init__(self, form_factors):
+        self._size = len(form_factors)
+        groups = OrderedDict()
+        for i, F in enumerate(form_factors):
+            groups.setdefault(type(F), []).append(i)
+        self._groups = []
+        for family, indices in viewitems(groups):
+            fields = [np.array([getattr(form_factors[i], name) for i in indices], dtype='float')
+                      for name in family._fields]
+            self._groups.append((np.array(indices), family, fields))
+        # Packed records, broadcastable against q² arrays of each dimension.
+        self._records = {}
+
+    def __len__(self):
+        return self._size
+
+    def _get_records(self, ndim):
+        try:
+            return self._records[ndim]
+        except KeyError:
+            pass
+        transition_axis = (-1,) + ndim*(1,)
+        records = [(indices, family(*[field.reshape(transition_axis) for field in fields]))
+                   for indices, family, fields in self._groups]
+        self._records[ndim] = records
+        return records
+
+    def __call__(self, q2, aligned=False):
+        q2 = np.asarray(q2, dtype='float')
+        if aligned:
+            records = self._get_records(q2.ndim - 1)
+            shape = q2.shape
+        else:
+            records = self._get_records(q2.ndim)
+            shape = (self._size,) + q2.shape
+        if len(records) == 1:
+            _, p = records[0]
+            return p.evaluate(p, q2)
+        values = np.empty(shape)
+        for indices, p in records:
+            values[indices] = p.evaluate(p, q2[indices] if aligned else q2)
+        return values
+
 # Pseudoscalar form factors (section C.1.1)
 # -----------------------------------------
 
-def _pseudoscalar_f0_form_factor(F0, m_fit):
-    return lambda q2: F0 / (1 - q2/m_fit**2)
+class _PseudoscalarF0FormFactor(_FormFactor, namedtuple('_PseudoscalarF0FormFactor',
+                                                         ['F0', 'm_fit'])):
+    __slots__ = ()
+
+    @staticmethod
+    def evaluate(p, q2):
+        return p.F0 / (1 - q2/p.m_fit**2)
 
-_form_factors[('B', 'K' )] = _pseudoscalar_f0_form_factor(0.33 , sqrt(38))
-_form_factors[('B', 'pi')] = _pseudoscalar_f0_form_factor(0.258, sqrt(38))
-_form_factors[('K', 'pi')] = _pseudoscalar_f0_form_factor(0.96 , INF     )
+_form_factors[('B', 'K' )] = _PseudoscalarF0FormFactor(0.33 , sqrt(38))
+_form_factors[('B', 'pi')] = _PseudoscalarF0FormFactor(0.258, sqrt(38))
+_form_factors[('K', 'pi')] = _PseudoscalarF0FormFactor(0.96 , INF     )
 
 # Scalar form factors (section C.1.2)
 # -----------------------------------
 
-def _scalar_fplus_form_factor(F0, a, b):
-    return lambda q2: F0 / ( 1 - a*(q2/mB**2) + b*(q2/mB**2)**2 )
+def _scalar_fplus(F0, a, b, q2):
+    return F0 / ( 1 - a*(q2/mB**2) + b*(q2/mB**2)**2 )
 
-def _scalar_f0_form_factor(F0, a, b, mS):
-    fplus = _scalar_fplus_form_factor(F0, a, b)
-    return lambda q2: fplus(q2) * (1 - q2 / (mB**2 - mS**2))
+class _ScalarF0FormFactor(_FormFactor, namedtuple('_ScalarF0FormFactor',
+                                                   ['F0', 'a', 'b', 'mS'])):
+    __slots__ = ()
+
+    @staticmethod
+    def evaluate(p, q2):
+        return _scalar_fplus(p.F0, p.a, p.b, q2) * (1 - q2 / (mB**2 - p.mS**2))
 
 _form_factors[('B', 'K*_0(700)' )] = \
-    _scalar_f0_form_factor(0.466964, 1.6, 1.35, get_mass('K*_0(700)' ))
+    _ScalarF0FormFactor(0.466964, 1.6, 1.35, get_mass('K*_0(700)' ))
 _form_factors[('B', 'K*_0(1430)')] = \
-    _scalar_f0_form_factor(0.166177, 4.4, 6.4 , get_mass('K*_0(1430)'))
+    _ScalarF0FormFactor(0.166177, 4.4, 6.4 , get_mass('K*_0(1430)'))
 
 # Vector form factors (section C.2.1)
 # -----------------------------------
 
-def _vector_A0_Kstar892_form_factor(r1, r2, m_fit):
-    return lambda q2: r1 / (1 - q2/mB**2) + r2 / ( 1 - q2/m_fit**2 )
+class _VectorA0Kstar892FormFactor(_FormFactor, namedtuple('_VectorA0Kstar892FormFactor',
+                                                           ['r1', 'r2', 'm_fit'])):
+    __slots__ = ()
+
+    @staticmethod
+    def evaluate(p, q2):
+        return p.r1 / (1 - q2/mB**2) + p.r2 / ( 1 - q2/p.m_fit**2 )
+
+def _xi(xi0, q2):
+    return xi0 / (1 - q2/mB**2)
 
-def _xi(xi0):
-    return lambda q2: xi0 / (1 - q2/mB**2)
+class _VectorA0KstarFormFactor(_FormFactor, namedtuple('_VectorA0KstarFormFactor',
+                                                        ['xi0_perp', 'xi0_par', 'mV'])):
+    __slots__ = ()
 
-def _vector_A0_Kstar_form_factor(xi0_perp, xi0_par, mV):
-    xi_perp = _xi(xi0_perp)
-    xi_par  = _xi(xi0_par )
-    def A0(q2):
+    @staticmethod
+    def evaluate(p, q2):
+        mV = p.mV
         EV = mB/2 * ( 1 - q2/mB**2 + (mV/mB)**2 )
-        return (1 - mV**2/(mB*EV)) * xi_par(q2) + (mV/mB) * xi_perp(q2)
-    return A0
+        return (1 - mV**2/(mB*EV)) * _xi(p.xi0_par, q2) + (mV/mB) * _xi(p.xi0_perp, q2)
 
 _form_factors[('B', 'K*')] = \
-     _vector_A0_Kstar892_form_factor(1.364, -0.99, sqrt(36.8))
+     _VectorA0Kstar892FormFactor(1.364, -0.99, sqrt(36.8))
 _form_factors[('B', 'K*(1410)')] = \
-    _vector_A0_Kstar_form_factor(0.28, 0.22, get_mass('K*(1410)'))
+    _VectorA0KstarFormFactor(0.28, 0.22, get_mass('K*(1410)'))
 _form_factors[('B', 'K*(1680)')] = \
-    _vector_A0_Kstar_form_factor(0.24, 0.18, get_mass('K*(1680)'))
+    _VectorA0KstarFormFactor(0.24, 0.18, get_mass('K*(1680)'))
 
 # Pseudo-vector (section C.2.2)
 # -----------------------------
 
-def _pseudovector_VAB_form_factor(F0, a, b):
-    return lambda q2: F0 / (1 - a*(q2/mB**2) + b*(q2/mB**2)**2)
+class _PseudovectorVABFormFactor(_FormFactor, namedtuple('_PseudovectorVABFormFactor',
+                                                          ['F0', 'a', 'b'])):
+    __slots__ = ()
+
+    @staticmethod
+    def evaluate(p, q2):
+        return p.F0 / (1 - p.a*(q2/mB**2) + p.b*(q2/mB**2)**2)
 
 # Masses of the K_1A and K_1B (assuming zero quark masses)
 m_K1A = 1.31 # GeV
@@ -83,21 +177,31 @@ m_K1B = 1.34 # GeV
 # Mixing angle between K_1(1270), K_1(1400) and K_1A, K_2A.
 theta_K1 = -34 * degree
 
-_V0A = _pseudovector_VAB_form_factor( 0.22, 2.4 , 1.78)
-_V0B = _pseudovector_VAB_form_factor(-0.45, 1.34, 0.69)
+_V0A = _PseudovectorVABFormFactor( 0.22, 2.4 , 1.78)
+_V0B = _PseudovectorVABFormFactor(-0.45, 1.34, 0.69)
+
+class _PseudovectorVBK1FormFactor(_FormFactor, namedtuple('_PseudovectorVBK1FormFactor',
+                                                           ['m_K1', 'xA', 'xB'])):
+    __slots__ = ()
 
-def _pseudovector_V_B_K1_form_factor(m_K1, xA, xB):
-    return lambda q2: (xA * m_K1A * _V0A(q2) + xB * m_K1B * _V0B(q2) ) / m_K1
+    @staticmethod
+    def evaluate(p, q2):
+        return (p.xA * m_K1A * _V0A(q2) + p.xB * m_K1B * _V0B(q2) ) / p.m_K1
 
 _form_factors[('B', 'K_1(1270)')] = \
-    _pseudovector_V_B_K1_form_factor(get_mass('K_1(1270)'), sin(theta_K1),  cos(theta_K1))
+    _PseudovectorVBK1FormFactor(get_mass('K_1(1270)'), sin(theta_K1),  cos(theta_K1))
 _form_factors[('B', 'K_1(1400)')] = \
-    _pseudovector_V_B_K1_form_factor(get_mass('K_1(1400)'), cos(theta_K1), -sin(theta_K1))
+    _PseudovectorVBK1FormFactor(get_mass('K_1(1400)'), cos(theta_K1), -sin(theta_K1))
 
 # Tensor final meson state
 # ------------------------
 
-def _tensor_A0_form_factor(F0, aT, bT):
-    return lambda q2: F0 / ( (1-q2/mB**2) * (1-aT*(q2/mB**2)+bT*(q2/mB**2)**2) )
+class _TensorA0FormFactor(_FormFactor, namedtuple('_TensorA0FormFactor',
+                                                   ['F0', 'aT', 'bT'])):
+    __slots__ = ()
+
+    @staticmethod
+    def evaluate(p, q2):
+        return p.F0 / ( (1-q2/mB**2) * (1-p.aT*(q2/mB**2)+p.bT*(q2/mB**2)**2) )
 
-_form_factors[('B', 'K*_2(1430)')] = _tensor_A0_form_factor(0.23, 1.23, 0.74)
+_form_factors[('B', 'K*_2(1430)')] = _TensorA0FormFactor(0.23, 1.23, 0.74)
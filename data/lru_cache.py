@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+# We use OrderedDict to keep track of the order in which keys were used.
+# (`functools.lru_cache` is not available in Python 2.)
+from collections import OrderedDict, namedtuple
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class LRUCache(object):
+    '''
+    Bounded mapping which discards the least recently used entries first.
+
+    `maxsize=None` makes the cache unbounded. The numbers of hits and misses
+    are recorded and can be queried through `info()`, in the same format as
+    `functools.lru_cache`.
+    '''
+    def __init__(self, maxsize=128):
+        if maxsize is not None and maxsize < 0:
+            raise(ValueError('The size of the cache cannot be negative.'))
+        self._maxsize = maxsize
+        self._data = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def lookup(self, key):
+        '''
+        Returns the value associated with `key` and marks it as recently used.
+
+        Raises `KeyError` if the key is not in the cache.
+        '''
+        try:
+            value = self._data.pop(key)
+        except KeyError:
+            self._misses += 1
+            raise
+        self._data[key] = value
+        self._hits += 1
+        return value
+
+    def insert(self, key, value):
+        'Adds an entry to the cache, evicting the oldest ones if needed.'
+        if self._maxsize == 0:
+            return
+        self._data.pop(key, None)
+        self._data[key] = value
+        if self._maxsize is not None:
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, func):
+        'Returns the cached value for `key`, calling `func()` on a miss.'
+        try:
+            return self.lookup(key)
+        except KeyError:
+            value = func()
+            self.insert(key, value)
+            return value
+
+    def clear(self):
+        'Removes all entries and resets the statistics.'
+        self._data.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def info(self):
+        return CacheInfo(self._hits, self._misses, self._maxsize, len(self._data))
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    @property
+    def maxsize(self):
+        return self._maxsize
@@ -3,12 +3,13 @@
 from __future__ import division
 
 import os
-import pandas
+from collections import namedtuple
 import numpy as np
-from particletools.tables import PYTHIAParticleData
 
 from . import constants as cst
-from . import qcd
+
+# NOTE: pandas, particletools and the QCD modules (which load rundec and SciPy)
+# are slow to import, so they are only imported when first needed.
 
 _srcdir = os.path.dirname(__file__)
 
@@ -19,16 +20,63 @@ _srcdir = os.path.dirname(__file__)
 _k0_codes = {'K_S': 310, 'K_L': 130}
 _k0_names = {val: key for key, val in _k0_codes.items()}
 
-_meson_df = pandas.read_csv(os.path.join(_srcdir, 'meson_properties.dat'),
-                            delim_whitespace=True)
-_meson_names = list(_meson_df.Name) + list(_k0_codes.keys())
-
-def _get_meson(feature, value):
-    query = _meson_df[_meson_df[feature] == value]
-    assert(len(query) <= 1)
-    if len(query) < 1:
-        raise(ValueError('No meson with {} == {}'.format(feature, value)))
-    return query.iloc[0]
+# Immutable record holding the properties of a meson, with the same fields as
+# the columns of `meson_properties.dat`.
+_MesonRecord = namedtuple('_MesonRecord', [
+    'Name', 'Mass', 'SpinCode', 'Parity', 'IdZero', 'IdPlus', 'SelfConjugate',
+    'S', 'C', 'B'])
+
+def _to_int(value):
+    # Missing quantum numbers are read as NaN, which we keep as is.
+    return int(value) if np.isfinite(value) else float(value)
+
+def _load_meson_records(path):
+    import pandas
+    df = pandas.read_csv(path, delim_whitespace=True)
+    return [_MesonRecord(Name=str(row.Name), Mass=float(row.Mass),
+                         SpinCode=int(row.SpinCode), Parity=int(row.Parity),
+                         IdZero=int(row.IdZero), IdPlus=int(row.IdPlus),
+                         SelfConjugate=bool(row.SelfConjugate),
+                         S=_to_int(row.S), C=_to_int(row.C), B=_to_int(row.B))
+            for row in df.itertuples(index=False)]
+
+# The records indexed by name and by (absolute) PDG code, so that looking up
+# the properties of a meson is a simple dictionary access, as well as the set
+# of all meson names.
+_MesonIndex = namedtuple('_MesonIndex', ['by_name', 'by_id', 'names'])
+
+# Snapshot of the particle properties (see `snapshot.py`), loaded on first use.
+# Set to False if it is unavailable, in which case the source files are used.
+_snapshot = None
+
+def _get_snapshot():
+    global _snapshot
+    if _snapshot is None:
+        from . import snapshot
+        _snapshot = snapshot.load_snapshot() or False
+    return _snapshot
+
+_meson_index = None
+
+def _get_meson_index():
+    'Returns the index of meson records, loading the data on first use.'
+    global _meson_index
+    if _meson_index is None:
+        snapshot = _get_snapshot()
+        if snapshot:
+            records = [_MesonRecord(*fields) for fields in snapshot['mesons']]
+        else:
+            records = _load_meson_records(os.path.join(_srcdir, 'meson_properties.dat'))
+        by_name = {record.Name: record for record in records}
+        by_id = {}
+        for record in records:
+            for pdg_id in [record.IdZero, record.IdPlus]:
+                if pdg_id != 0:
+                    assert(pdg_id not in by_id)
+                    by_id[pdg_id] = record
+        names = frozenset(list(by_name) + list(_k0_codes.keys()))
+        _meson_index = _MesonIndex(by_name, by_id, names)
+    return _meson_index
 
 def _split_meson_charge(meson_name):
     # Separates the name of the QCD state and its charge
@@ -42,28 +90,29 @@ def _split_meson_charge(meson_name):
 
 def _get_meson_by_name(meson_name):
     # Special case for neutral kaons
+    mesons_by_name = _get_meson_index().by_name
     if meson_name in ['K_S0', 'K_L0']:
-        return _get_meson_by_name('K')
+        return mesons_by_name['K']
+    # Handle mesons specified without the electric charge (e.g. `K*`)
+    record = mesons_by_name.get(meson_name)
+    if record is not None:
+        return record
+    # Handle mesons specified with the charge (e.g. `K*0`)
+    qcd_state, charge = _split_meson_charge(meson_name)
     try:
-        # Handle mesons specified without the electric charge (e.g. `K*`)
-        return _get_meson('Name', meson_name)
-    except:
-        # Handle mesons specified with the charge (e.g. `K*0`)
-        qcd_state, charge = _split_meson_charge(meson_name)
-        return _get_meson('Name', qcd_state)
+        return mesons_by_name[qcd_state]
+    except KeyError:
+        raise(ValueError('No meson with Name == {}'.format(qcd_state)))
 
 def _get_meson_by_id(pdg_id):
     # Handle the special case of K_S0 and K_L0
     if pdg_id in _k0_names:
         return _k0_names[pdg_id] + '0'
     # Handle the general case
-    query = _meson_df[(_meson_df['IdZero'] == abs(pdg_id))
-                      | (_meson_df['IdPlus'] == abs(pdg_id))]
-    assert(len(query) <= 1)
-    if len(query) < 1:
+    try:
+        record = _get_meson_index().by_id[abs(pdg_id)]
+    except KeyError:
         raise(ValueError('No meson corresponding to PDG code {}'.format(pdg_id)))
-    else:
-        record = query.iloc[0]
     qcd_state = record.Name
     # Infer the charge (and 'bar') from the PDG code
     if +record.IdZero == pdg_id:
@@ -171,17 +220,43 @@ def _get_lepton_spin_code(lepton_name):
 # Generic particle properties
 # ---------------------------
 
-_pdata = PYTHIAParticleData()
+_pdata = None
+
+def _get_pdata():
+    global _pdata
+    if _pdata is None:
+        from particletools.tables import PYTHIAParticleData
+        _pdata = PYTHIAParticleData()
+        # The database is loaded anyway, so check that the snapshot is not stale.
+        snapshot = _get_snapshot()
+        if snapshot:
+            from .snapshot import check_generic
+            if not check_generic(snapshot, _pdata):
+                snapshot['generic'] = {}
+    return _pdata
+
+def _get_generic_properties(particle):
+    # Returns the (PDG code, mass) of the particle if it is in the snapshot.
+    snapshot = _get_snapshot()
+    if snapshot:
+        return snapshot['generic'].get(particle)
+    return None
 
 def _get_generic_pdg_id(particle):
+    properties = _get_generic_properties(particle)
+    if properties is not None:
+        return properties[0]
     try:
-        return _pdata.pdg_id(particle)
+        return _get_pdata().pdg_id(particle)
     except:
         raise(ValueError("Particle '{}' not found in PYTHIA database.".format(particle)))
 
 def _get_generic_mass(particle):
+    properties = _get_generic_properties(particle)
+    if properties is not None:
+        return properties[1]
     try:
-        return _pdata.mass(particle)
+        return _get_pdata().mass(particle)
     except:
         raise(ValueError("Particle '{}' not found in PYTHIA database.".format(particle)))
 
@@ -189,12 +264,13 @@ def _get_generic_mass(particle):
 # ----------
 
 def is_meson(particle):
-    if particle in _meson_names:
+    meson_names = _get_meson_index().names
+    if particle in meson_names:
         return True
     else:
         try:
             basename, charge = _split_meson_charge(particle)
-            if basename in _meson_names:
+            if basename in meson_names:
                 return True
         except:
             return False
@@ -298,6 +374,31 @@ def get_abs_beauty(particle):
 # Quark masses and strong coupling constant
 # -----------------------------------------
 
+# Available backends for the running of α_s and of the MSbar quark masses:
+#   'rundec': call CRunDec separately for every scale (exact but slow);
+#   'spline': interpolate precomputed tables (see `running.py`), which
+#             evaluates whole arrays of scales at NumPy speed.
+_qcd_backends = ['rundec', 'spline']
+_qcd_backend = 'rundec'
+
+def set_qcd_backend(backend):
+    '''
+    Globally select the backend used to compute the running of α_s and of
+    the MSbar quark masses.
+
+    The 'spline' backend agrees with the default 'rundec' one to a relative
+    accuracy of `running.default_rtol` (10⁻¹⁰) between 1 GeV and 1 TeV.
+    '''
+    global _qcd_backend
+    if backend not in _qcd_backends:
+        raise(ValueError("Unknown QCD backend '{}' (must be one of {}).".format(
+            backend, ', '.join(_qcd_backends))))
+    _qcd_backend = backend
+
+def get_qcd_backend():
+    'Returns the name of the backend currently used for the running of QCD parameters.'
+    return _qcd_backend
+
 def alpha_s(mu, nf):
     """
     Computes the strong coupling constant α_s at scale μ with nf dynamical flavors
@@ -307,8 +408,9 @@ def alpha_s(mu, nf):
 
     Running is computed at 5 loops, and decoupling at 4 loops.
 
-    numpy.vectorize is used to emulate NumPy broadcast rules in `mu`, but is not
-    as fast as native vectorization.
+    With the default 'rundec' backend, numpy.vectorize is used to emulate NumPy
+    broadcast rules in `mu`, but is not as fast as native vectorization. The
+    'spline' backend (see `set_qcd_backend`) is natively vectorized.
 
     RunDec references:
     * Chetyrkin, K. G., J. H. Kuehn, and M. Steinhauser.
@@ -333,6 +435,9 @@ def alpha_s(mu, nf):
       The European Physical Journal C 78, no. 12 (December 19, 2018): 1026.
       https://doi.org/10.1140/epjc/s10052-018-6492-7.
     """
+    from . import qcd, running
+    if _qcd_backend == 'spline':
+        return running.alpha_s(mu, nf, alphasMZ=cst.alpha_s_MZ, loop=5)
     return np.vectorize(lambda _mu: qcd.alpha_s(_mu, nf, alphasMZ=cst.alpha_s_MZ, loop=5), cache=True)(mu)
 
 _pole_masses = {
@@ -359,15 +464,28 @@ def on_shell_mass(q):
     else:
         return M_q
 
+# Reference masses for the running: m_s(2 GeV), m_c(m_c) and m_b(m_b).
+_msbar_reference_masses = {
+    's': cst.m_s_msbar_2GeV,
+    'c': cst.m_c_si,
+    'b': cst.m_b_si,
+}
+
 def msbar_mass(q, mu, nf):
     """
     Returns the running quark mass in the MSbar scheme at a scale μ, in a
     theory with nf dynamical flavors.
 
     We use CRunDec through a slightly modified version of the `wilson.util.qcd` wrapper.
+    With the 'spline' backend (see `set_qcd_backend`), the running masses are
+    instead interpolated from tables precomputed on first use.
     """
+    from . import qcd, running
     if q in ['u', 'd', 't']:
         raise(ValueError('MSbar mass not implemented for {} quark.'.format(q)))
+    elif q in _msbar_reference_masses and _qcd_backend == 'spline':
+        return running.msbar_mass(q, _msbar_reference_masses[q], mu, nf,
+                                  alphasMZ=cst.alpha_s_MZ, loop=5)
     elif q == 's':
         return np.vectorize(
             lambda _mu: qcd.m_s(cst.m_s_msbar_2GeV, _mu, nf, alphasMZ=cst.alpha_s_MZ, loop=5),
@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
-"""User-friendly interface to `python-rundec` to compute running quark masses and the strong coupling constant."""
+"""User-friendly interface to `python-rundec` to compute running quark masses and the strong coupling constant.
+
+The computations are done by a shared `QCDEvaluator` for each parameter set
+(see `get_evaluator`), which reuses a single CRunDec instance and caches the
+matching steps and the results."""
 
 # MIT License
 
@@ -28,8 +32,13 @@
 # * Don't use @lru_cache and remove functools dependency, to make Python 2 happy.
 # * Replace unreachable exceptions with assert(False).
 
+from __future__ import absolute_import
+
 import rundec
 
+from .lru_cache import LRUCache
+
+
 def _sane(scale, f):
     """Check if scale and no. of flavours are sane"""
     if scale <= 0:
@@ -40,131 +49,215 @@ def _sane(scale, f):
 
 MZ = 91.1876
 
+# Default number of scalar results kept by each evaluator.
+default_cache_size = 4096
+
+
+class QCDEvaluator(object):
+    """Computes alpha_s and the running quark masses for a fixed initial
+    condition alpha_s(MZ) = `alphasMZ` and a fixed number of loops.
+
+    A single CRunDec instance is reused for all calls, the intermediate
+    couplings and masses at the matching scales (which do not depend on the
+    final scale) are computed only once, and the results are stored in a
+    bounded LRU cache of size `cache_size`, whose statistics are returned by
+    `cache_info()`."""
+    def __init__(self, alphasMZ=0.1185, loop=3, cache_size=default_cache_size):
+        self._alphasMZ = alphasMZ
+        self._loop = loop
+        self._crd = rundec.CRunDec()
+        self._constants = {}
+        self._cache = LRUCache(cache_size)
+
+    @property
+    def alphasMZ(self):
+        return self._alphasMZ
+
+    @property
+    def loop(self):
+        return self._loop
+
+    def cache_info(self):
+        """Hits, misses, maximum and current size of the cache of results."""
+        return self._cache.info()
+
+    def clear_cache(self):
+        self._cache.clear()
+        self._constants.clear()
+
+    def _set_threshold(self, Mth, muth, nf):
+        crd = self._crd
+        crd.nfMmu.Mth = Mth
+        crd.nfMmu.muth = muth
+        crd.nfMmu.nf = nf
+        return crd.nfMmu
+
+    def _constant(self, key, func):
+        # Scale-independent intermediate results are few, so we keep all of them.
+        try:
+            return self._constants[key]
+        except KeyError:
+            value = func()
+            self._constants[key] = value
+            return value
+
+    def _cached(self, key, func):
+        return self._cache.get_or_compute(key, func)
+
+    def alpha_s(self, scale, f):
+        """alpha_s at the scale `scale` for f flavours"""
+        if scale == MZ and f == 5:
+            return self._alphasMZ  # nothing to do
+        return self._cached(('alpha_s', scale, f), lambda: self._alpha_s(scale, f))
+
+    def _alpha_s_mc(self):
+        # alpha_s at the charm threshold, in the 4-flavour theory
+        def compute():
+            thr = self._set_threshold(4.8, 4.8, 5)
+            return self._crd.AlH2AlL(self._alphasMZ, MZ, thr, 1.3, self._loop)
+        return self._constant('alpha_s_mc', compute)
+
+    def _alpha_s(self, scale, f):
+        _sane(scale, f)
+        crd = self._crd
+        alphasMZ, loop = self._alphasMZ, self._loop
+        if f == 5:
+            return_value = crd.AlphasExact(alphasMZ, MZ, scale, f, loop)
+        elif f == 6:
+            thr = self._set_threshold(170, 170, 6)
+            return_value = crd.AlL2AlH(alphasMZ, MZ, thr, scale, loop)
+        elif f == 4:
+            thr = self._set_threshold(4.8, 4.8, 5)
+            return_value = crd.AlH2AlL(alphasMZ, MZ, thr, scale, loop)
+        elif f == 3:
+            mc = 1.3
+            asmc = self._alpha_s_mc()
+            thr = self._set_threshold(mc, mc, 4)
+            return_value = crd.AlH2AlL(asmc, mc, thr, scale, loop)
+        else:
+            assert(False) # pragma: no cover
+        if return_value == 0:
+            raise ValueError("Return value is 0, probably `scale={}` is too small.".format(scale))
+        else:
+            return return_value
+
+    def m_b(self, mbmb, scale, f):
+        r"""Running b quark mass at the scale `scale` in the theory with `f`
+        dynamical quark flavours starting from $m_b(m_b)$"""
+        if scale == mbmb and f == 5:
+            return mbmb  # nothing to do
+        return self._cached(('m_b', mbmb, scale, f), lambda: self._m_b(mbmb, scale, f))
+
+    def _m_b(self, mbmb, scale, f):
+        _sane(scale, f)
+        crd, loop = self._crd, self._loop
+        alphas_mb = self._constant(('alpha_s', mbmb, 5), lambda: self.alpha_s(mbmb, 5))
+        if f == 5:
+            alphas_scale = self.alpha_s(scale, f)
+            return crd.mMS2mMS(mbmb, alphas_mb, alphas_scale, f, loop)
+        elif f == 4:
+            thr = self._set_threshold(4.8, 4.8, 5)
+            return crd.mH2mL(mbmb, alphas_mb, mbmb, thr, scale, loop)
+        elif f == 3:
+            mc = 1.3
+            def compute_mbmc():
+                thr = self._set_threshold(4.8, 4.8, 5)
+                return crd.mH2mL(mbmb, alphas_mb, mbmb, thr, mc, loop)
+            mbmc = self._constant(('m_b(mc)', mbmb), compute_mbmc)
+            alphas_mc = self._constant(('alpha_s', mc, 4), lambda: self.alpha_s(mc, 4))
+            thr = self._set_threshold(mc, mc, 4)
+            return crd.mH2mL(mbmc, alphas_mc, mc, thr, scale, loop)
+        elif f == 6:
+            thr = self._set_threshold(170, 170, 6)
+            return crd.mL2mH(mbmb, alphas_mb, mbmb, thr, scale, loop)
+        else:
+            assert(False) # pragma: no cover
+
+    def m_c(self, mcmc, scale, f):
+        r"""Running c quark mass at the scale `scale` in the theory with `f`
+        dynamical quark flavours starting from $m_c(m_c)$"""
+        if scale == mcmc:
+            return mcmc  # nothing to do
+        return self._cached(('m_c', mcmc, scale, f), lambda: self._m_c(mcmc, scale, f))
+
+    def _m_c(self, mcmc, scale, f):
+        _sane(scale, f)
+        crd, loop = self._crd, self._loop
+        alphas_mc = self._constant(('alpha_s', mcmc, 4), lambda: self.alpha_s(mcmc, 4))
+        if f == 4:
+            alphas_scale = self.alpha_s(scale, f)
+            return crd.mMS2mMS(mcmc, alphas_mc, alphas_scale, f, loop)
+        elif f == 3:
+            thr = self._set_threshold(1.3, 1.3, 4)
+            return crd.mH2mL(mcmc, alphas_mc, mcmc, thr, scale, loop)
+        elif f == 5:
+            thr = self._set_threshold(4.8, 4.8, 5)
+            return crd.mL2mH(mcmc, alphas_mc, mcmc, thr, scale, loop)
+        else:
+            raise ValueError("Invalid input: f={}, scale={}".format(f, scale))
+
+    def m_s(self, ms2, scale, f):
+        r"""Running s quark mass at the scale `scale` in the theory with `f`
+        dynamical quark flavours starting from $m_s(2 \,\text{GeV})$"""
+        if scale == 2 and f == 3:
+            return ms2  # nothing to do
+        return self._cached(('m_s', ms2, scale, f), lambda: self._m_s(ms2, scale, f))
+
+    def _m_s(self, ms2, scale, f):
+        _sane(scale, f)
+        crd, loop = self._crd, self._loop
+        alphas_2 = self._constant(('alpha_s', 2, 3), lambda: self.alpha_s(2, 3))
+        if f == 3:
+            alphas_scale = self.alpha_s(scale, f)
+            return crd.mMS2mMS(ms2, alphas_2, alphas_scale, f, loop)
+        elif f == 4:
+            thr = self._set_threshold(1.3, 1.3, 4)
+            return crd.mL2mH(ms2, alphas_2, 2, thr, scale, loop)
+        elif f == 5:
+            mc = 1.3
+            def compute_msmc():
+                thr = self._set_threshold(mc, mc, 4)
+                return crd.mL2mH(ms2, alphas_2, 2, thr, mc, loop)
+            msmc = self._constant(('m_s(mc)', ms2), compute_msmc)
+            alphas_mc = self._constant(('alpha_s', mc, 4), lambda: self.alpha_s(mc, 4))
+            thr = self._set_threshold(4.8, 4.8, 5)
+            return crd.mL2mH(msmc, alphas_mc, mc, thr, scale, loop)
+        else:
+            raise ValueError("Invalid input: f={}, scale={}".format(f, scale))
+
+
+_evaluators = {}
+
+def get_evaluator(alphasMZ=0.1185, loop=3):
+    """Returns the shared `QCDEvaluator` for this set of parameters."""
+    key = (alphasMZ, loop)
+    try:
+        return _evaluators[key]
+    except KeyError:
+        evaluator = QCDEvaluator(alphasMZ, loop)
+        _evaluators[key] = evaluator
+        return evaluator
+
 
 def alpha_s(scale, f, alphasMZ=0.1185, loop=3):
     """3-loop computation of alpha_s for f flavours
     with initial condition alpha_s(MZ) = 0.1185"""
-    if scale == MZ and f == 5:
-        return alphasMZ  # nothing to do
-    _sane(scale, f)
-    crd = rundec.CRunDec()
-    if f == 5:
-        return_value = crd.AlphasExact(alphasMZ, MZ, scale, f, loop)
-    elif f == 6:
-        crd.nfMmu.Mth = 170
-        crd.nfMmu.muth = 170
-        crd.nfMmu.nf = 6
-        return_value = crd.AlL2AlH(alphasMZ, MZ, crd.nfMmu, scale, loop)
-    elif f == 4:
-        crd.nfMmu.Mth = 4.8
-        crd.nfMmu.muth = 4.8
-        crd.nfMmu.nf = 5
-        return_value = crd.AlH2AlL(alphasMZ, MZ, crd.nfMmu, scale, loop)
-    elif f == 3:
-        crd.nfMmu.Mth = 4.8
-        crd.nfMmu.muth = 4.8
-        crd.nfMmu.nf = 5
-        mc = 1.3
-        asmc =  crd.AlH2AlL(alphasMZ, MZ, crd.nfMmu, mc, loop)
-        crd.nfMmu.Mth = mc
-        crd.nfMmu.muth = mc
-        crd.nfMmu.nf = 4
-        return_value = crd.AlH2AlL(asmc, mc, crd.nfMmu, scale, loop)
-    else:
-        assert(False) # pragma: no cover
-    if return_value == 0:
-        raise ValueError("Return value is 0, probably `scale={}` is too small.".format(scale))
-    else:
-        return return_value
+    return get_evaluator(alphasMZ, loop).alpha_s(scale, f)
 
 
 def m_b(mbmb, scale, f, alphasMZ=0.1185, loop=3):
     r"""Get running b quark mass in the MSbar scheme at the scale `scale`
     in the theory with `f` dynamical quark flavours starting from $m_b(m_b)$"""
-    if scale == mbmb and f == 5:
-        return mbmb  # nothing to do
-    _sane(scale, f)
-    alphas_mb = alpha_s(mbmb, 5, alphasMZ=alphasMZ, loop=loop)
-    crd = rundec.CRunDec()
-    if f == 5:
-        alphas_scale = alpha_s(scale, f, alphasMZ=alphasMZ, loop=loop)
-        return crd.mMS2mMS(mbmb, alphas_mb, alphas_scale, f, loop)
-    elif f == 4:
-        crd.nfMmu.Mth = 4.8
-        crd.nfMmu.muth = 4.8
-        crd.nfMmu.nf = 5
-        return crd.mH2mL(mbmb, alphas_mb, mbmb, crd.nfMmu, scale, loop)
-    elif f == 3:
-        mc = 1.3
-        crd.nfMmu.Mth = 4.8
-        crd.nfMmu.muth = 4.8
-        crd.nfMmu.nf = 5
-        mbmc = crd.mH2mL(mbmb, alphas_mb, mbmb, crd.nfMmu, mc, loop)
-        crd.nfMmu.Mth = mc
-        crd.nfMmu.muth = mc
-        crd.nfMmu.nf = 4
-        alphas_mc = alpha_s(mc, 4, alphasMZ=alphasMZ, loop=loop)
-        return crd.mH2mL(mbmc, alphas_mc, mc, crd.nfMmu, scale, loop)
-    elif f == 6:
-        crd.nfMmu.Mth = 170
-        crd.nfMmu.muth = 170
-        crd.nfMmu.nf = 6
-        return crd.mL2mH(mbmb, alphas_mb, mbmb, crd.nfMmu, scale, loop)
-    else:
-        assert(False) # pragma: no cover
+    return get_evaluator(alphasMZ, loop).m_b(mbmb, scale, f)
 
 
 def m_c(mcmc, scale, f, alphasMZ=0.1185, loop=3):
     r"""Get running c quark mass in the MSbar scheme at the scale `scale`
     in the theory with `f` dynamical quark flavours starting from $m_c(m_c)$"""
-    if scale == mcmc:
-        return mcmc  # nothing to do
-    _sane(scale, f)
-    crd = rundec.CRunDec()
-    alphas_mc = alpha_s(mcmc, 4, alphasMZ=alphasMZ, loop=loop)
-    if f == 4:
-        alphas_scale = alpha_s(scale, f, alphasMZ=alphasMZ, loop=loop)
-        return crd.mMS2mMS(mcmc, alphas_mc, alphas_scale, f, loop)
-    elif f == 3:
-        crd.nfMmu.Mth = 1.3
-        crd.nfMmu.muth = 1.3
-        crd.nfMmu.nf = 4
-        return crd.mH2mL(mcmc, alphas_mc, mcmc, crd.nfMmu, scale, loop)
-    elif f == 5:
-        crd.nfMmu.Mth = 4.8
-        crd.nfMmu.muth = 4.8
-        crd.nfMmu.nf = 5
-        return crd.mL2mH(mcmc, alphas_mc, mcmc, crd.nfMmu, scale, loop)
-    else:
-        raise ValueError("Invalid input: f={}, scale={}".format(f, scale))
+    return get_evaluator(alphasMZ, loop).m_c(mcmc, scale, f)
 
 
 def m_s(ms2, scale, f, alphasMZ=0.1185, loop=3):
     r"""Get running s quark mass in the MSbar scheme at the scale `scale`
     in the theory with `f` dynamical quark flavours starting from $m_s(2 \,\text{GeV})$"""
-    if scale == 2 and f == 3:
-        return ms2  # nothing to do
-    _sane(scale, f)
-    crd = rundec.CRunDec()
-    alphas_2 = alpha_s(2, 3, alphasMZ=alphasMZ, loop=loop)
-    if f == 3:
-        alphas_scale = alpha_s(scale, f, alphasMZ=alphasMZ, loop=loop)
-        return crd.mMS2mMS(ms2, alphas_2, alphas_scale, f, loop)
-    elif f == 4:
-        crd.nfMmu.Mth = 1.3
-        crd.nfMmu.muth = 1.3
-        crd.nfMmu.nf = 4
-        return crd.mL2mH(ms2, alphas_2, 2, crd.nfMmu, scale, loop)
-    elif f == 5:
-        mc = 1.3
-        crd.nfMmu.Mth = mc
-        crd.nfMmu.muth = mc
-        crd.nfMmu.nf = 4
-        msmc = crd.mL2mH(ms2, alphas_2, 2, crd.nfMmu, mc, loop)
-        crd.nfMmu.Mth = 4.8
-        crd.nfMmu.muth = 4.8
-        crd.nfMmu.nf = 5
-        alphas_mc = alpha_s(mc, 4, alphasMZ=alphasMZ, loop=loop)
-        return crd.mL2mH(msmc, alphas_mc, mc, crd.nfMmu, scale, loop)
-    else:
-        raise ValueError("Invalid input: f={}, scale={}".format(f, scale))
+    return get_evaluator(alphasMZ, loop).m_s(ms2, scale, f)
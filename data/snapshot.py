@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+"""
+Binary snapshot of the particle properties used by the package.
+
+Parsing `meson_properties.dat` with pandas and loading the PYTHIA particle
+database from `particletools` dominate the time needed to look up the first
+particle property. This module saves all the properties needed by the package
+into a single pickled file, which `particles.py` loads with a single read.
+
+The text files remain the source of truth: the snapshot records a hash of its
+sources, and is ignored (with a warning) if it does not match them anymore.
+Hashing the PYTHIA database would require loading it, so the snapshot instead
+records the version of `particletools` it was built with, and is likewise
+ignored if another version is installed. When the PYTHIA database is loaded
+anyway, the generic particles of the snapshot are also checked against it (see
+`check_generic`). To rebuild the snapshot after modifying the sources or
+upgrading `particletools`, run:
+
+    python -m scalar_portal.data.snapshot
+"""
+
+from __future__ import absolute_import
+
+import os
+import glob
+import hashlib
+import pickle
+from warnings import warn
+
+
+_srcdir = os.path.dirname(__file__)
+
+default_path = os.path.join(_srcdir, 'particles.snapshot')
+
+# Bump this when changing the layout of the snapshot.
+_format_version = 3
+
+# Use a protocol which can be read by both Python 2 and 3.
+_pickle_protocol = 2
+
+# Particles (other than mesons) looked up in the PYTHIA database.
+_generic_particles = [
+    'e-', 'e+', 'mu-', 'mu+', 'tau-', 'tau+',
+    'nu_e', 'nu_ebar', 'nu_mu', 'nu_mubar', 'nu_tau', 'nu_taubar',
+    'd', 'dbar', 'u', 'ubar', 's', 'sbar', 'c', 'cbar', 'b', 'bbar', 't', 'tbar',
+    'g', 'gamma', 'Z0', 'W+', 'W-',
+]
+
+def _meson_properties_path():
+    return os.path.join(_srcdir, 'meson_properties.dat')
+
+def source_hash():
+    """
+    Hash of the sources of the snapshot (the meson properties). Does not
+    require loading pandas or the PYTHIA database.
+    """
+    h = hashlib.sha1()
+    h.update(str(_format_version).encode())
+    with open(_meson_properties_path(), 'rb') as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+def _get_particletools_version():
+    '''
+    Version of the installed `particletools`, read from the name of its
+    distribution metadata without importing it (None if it is not found).
+    '''
+    try:
+        try:
+            from importlib.util import find_spec
+        except ImportError: # Python 2
+            import imp
+            package_dir = imp.find_module('particletools')[1]
+        else:
+            package_dir = os.path.dirname(find_spec('particletools').origin)
+    except (ImportError, AttributeError):
+        return None
+    site_dir = os.path.dirname(package_dir)
+    prefix = 'particletools-'
+    for pattern in [prefix + '*.dist-info', prefix + '*.egg-info']:
+        for path in glob.glob(os.path.join(site_dir, pattern)):
+            return os.path.splitext(os.path.basename(path))[0][len(prefix):]
+    return None
+
+def _read_generic(pdata):
+    'Reads the (PDG code, mass) of the generic particles from the PYTHIA database.'
+    return {particle: (int(pdata.pdg_id(particle)), float(pdata.mass(particle)))
+            for particle in _generic_particles}
+
+def build_snapshot():
+    'Collects all the particle properties from their sources.'
+    from particletools.tables import PYTHIAParticleData
+    from .particles import _load_meson_records
+    return {
+        'version'    : _format_version,
+        'source_hash': source_hash(),
+        'mesons'     : [tuple(record) for record in
+                        _load_meson_records(_meson_properties_path())],
+        'generic'    : _read_generic(PYTHIAParticleData()),
+        'particletools_version': _get_particletools_version(),
+    }
+
+def write_snapshot(path=default_path):
+    snapshot = build_snapshot()
+    with open(path, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=_pickle_protocol)
+    return snapshot
+
+def load_snapshot(path=default_path):
+    """
+    Loads the snapshot from `path`.
+
+    Returns None if the file does not exist, or if it is out of date with
+    respect to its sources or to the installed `particletools`.
+    """
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except (IOError, OSError):
+        return None
+    if (snapshot.get('version') != _format_version or
+        snapshot.get('source_hash') != source_hash()):
+        warn('The particle data snapshot {} is out of date, falling back to the '
+             'source files. Run `python -m scalar_portal.data.snapshot` to '
+             'rebuild it.'.format(path))
+        return None
+    installed_version = _get_particletools_version()
+    if snapshot.get('particletools_version') != installed_version:
+        warn('The particle data snapshot {} was built with particletools {}, but '
+             'version {} is installed, falling back to the source files. Run '
+             '`python -m scalar_portal.data.snapshot` to rebuild it.'.format(
+                 path, snapshot.get('particletools_version'), installed_version))
+        return None
+    return snapshot
+
+def check_generic(snapshot, pdata):
+    """
+    Checks that the generic particles of `snapshot` match the PYTHIA database
+    `pdata`, which may not be the case e.g. after modifying its data files.
+
+    Warns and returns False if they do not match, in which case the generic
+    particles of the snapshot must not be used.
+    """
+    if snapshot['generic'] == _read_generic(pdata):
+        return True
+    warn('The properties of the generic particles in the particle data snapshot '
+         '(built with particletools {}) differ from the ones of the installed '
+         'particletools {}, falling back to the PYTHIA database. Run '
+         '`python -m scalar_portal.data.snapshot` to rebuild it.'.format(snapshot.get('particletools_version'),
+                              _get_particletools_version()))
+    return False
+
+
+if __name__ == '__main__':
+    snapshot = write_snapshot()
+    print('Wrote {} mesons and {} other particles to {}.'.format(
+        len(snapshot['mesons']), len(snapshot['generic']), default_path))
@@ -5,7 +5,7 @@ from __future__ import absolute_import
 
 from ..data.constants import *
 from ..data.particles import *
-from ..api.channel import DecayChannel
+from ..api.channel import DecayChannel, Interval
 
 
 def normalized_decay_width(l, mS):
@@ -32,5 +32,13 @@ class Leptonic(DecayChannel):
             raise(ValueError('{} must be a valid lepton flavor (e, mu, tau)'.format(flavor)))
         self._flavor = flavor
 
-    def normalized_width(self, mS):
+    def normalized_width(self, mS, context=None):
         return normalized_decay_width(self._flavor, mS)
+
+    @property
+    def open_interval(self):
+        return Interval(2*get_mass(self._flavor))
+
+    @property
+    def kernel_key(self):
+        return (type(self), self._flavor)
@@ -3,53 +3,106 @@
 from __future__ import division
 from __future__ import absolute_import
 
+import json
 import numpy as np
 
-from ..api.channel import DecayChannel
-from ..data.particles import get_mass
-from . import two_pions  as pp
-from . import two_kaons  as kk
-from . import two_quarks as qq
-from . import two_gluons as gg
+from ..api.channel import DecayChannel, Interval
+from ..data import constants as cst
+from ..data.particles import get_mass, get_qcd_backend
 
 
 # Scale at which we match the toy model to the perturbative QCD result.
 _Lambda_S_pert = 2.0 # GeV
 
-# Threshold above which the multimeson channel opens.
-# This corresponds to the S -> 4π threshold.
-_m_th = 2 * get_mass('pi')
+def _m_th():
+    """
+    Threshold above which the multimeson channel opens.
+    This corresponds to the S -> 4π threshold.
+    """
+    return 2 * get_mass('pi')
 
 # The contribution from the multimeson channel is identically zero below m_th
 # and above Λ_S^pert.
 
 def _beta(mS):
     'Velocity factor in our toy model.'
-    return (1 - 4*(_m_th/mS)**2)**(1/2)
+    return (1 - 4*(_m_th()/mS)**2)**(1/2)
 
 # The phenomenological coefficient C used in the toy model.
 # It is computed by matching the toy model to the perturbative QCD result at
-# the scale Λ_S^pert.
-_partial_width_below = (
-    pp.normalized_total_width(_Lambda_S_pert) +
-    kk.normalized_total_width(_Lambda_S_pert)
-)
-_partial_width_above = (
-    gg.normalized_total_width(_Lambda_S_pert) +
-    qq.normalized_total_width(_Lambda_S_pert)
-)
-_C = ( (_partial_width_above - _partial_width_below)
-       / (_Lambda_S_pert**3 * _beta(_Lambda_S_pert)) )
+# the scale Λ_S^pert. This requires running α_s and the quark masses, so it is
+# only computed on first use, and memoized for each set of QCD inputs.
+_matching_coefficients = {}
+
+def _matching_key():
+    'Inputs on which the matching coefficient depends.'
+    return (get_qcd_backend(), cst.alpha_s_MZ, cst.m_s_msbar_2GeV, cst.m_c_si,
+            cst.m_b_si, cst.m_t_os, _Lambda_S_pert)
+
+def _compute_matching_coefficient():
+    from . import two_pions  as pp
+    from . import two_kaons  as kk
+    from . import two_quarks as qq
+    from . import two_gluons as gg
+    partial_width_below = (
+        pp.normalized_total_width(_Lambda_S_pert) +
+        kk.normalized_total_width(_Lambda_S_pert)
+    )
+    partial_width_above = (
+        gg.normalized_total_width(_Lambda_S_pert) +
+        qq.normalized_total_width(_Lambda_S_pert)
+    )
+    return float( (partial_width_above - partial_width_below)
+                  / (_Lambda_S_pert**3 * _beta(_Lambda_S_pert)) )
+
+def get_matching_coefficient():
+    """
+    Returns the coefficient C of the toy model, for the current QCD inputs.
+    """
+    key = _matching_key()
+    try:
+        return _matching_coefficients[key]
+    except KeyError:
+        C = _compute_matching_coefficient()
+        _matching_coefficients[key] = C
+        return C
+
+def set_matching_coefficient(C):
+    """
+    Sets the coefficient C of the toy model for the current QCD inputs, e.g.
+    using a value cached from a previous run, which avoids running α_s and
+    the quark masses.
+    """
+    _matching_coefficients[_matching_key()] = float(C)
+
+def save_matching_coefficients(path):
+    'Saves all the matching coefficients computed so far to a JSON file.'
+    records = [{'key': list(key), 'C': C} for key, C in _matching_coefficients.items()]
+    with open(path, 'w') as f:
+        json.dump(records, f)
+
+def load_matching_coefficients(path):
+    """
+    Loads matching coefficients saved with `save_matching_coefficients`.
+
+    Only the coefficients matching the current QCD inputs will subsequently be
+    used.
+    """
+    with open(path, 'r') as f:
+        records = json.load(f)
+    for record in records:
+        _matching_coefficients[tuple(record['key'])] = float(record['C'])
 
 def _normalized_decay_width(mS):
-    return _C * mS**3 * _beta(mS)
+    return get_matching_coefficient() * mS**3 * _beta(mS)
 
 def normalized_decay_width(mS):
     mS = np.asarray(mS, dtype='float')
-    open_ch = mS > 2 * _m_th
+    open_ch = mS > 2 * _m_th()
     valid = mS <= _Lambda_S_pert
     w = np.zeros_like(mS)
-    w[open_ch] = _normalized_decay_width(mS[open_ch])
+    if np.any(open_ch):
+        w[open_ch] = _normalized_decay_width(mS[open_ch])
     w[~valid] = float('nan')
     return w
 
@@ -67,8 +120,20 @@ class Multimeson(DecayChannel):
     def __str__(self):
         return 'S -> mesons...'
 
-    def normalized_width(self, mS):
+    def normalized_width(self, mS, context=None):
         return normalized_decay_width(mS)
 
+    @property
+    def validity_interval(self):
+        return Interval(upper=_Lambda_S_pert, closed='right')
+
+    @property
+    def open_interval(self):
+        return Interval(2 * _m_th())
+
+    @property
+    def kernel_key(self):
+        return (type(self),)
+
     def pythia_string(self, branching_ratio, scalar_id):
         return None
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+"""
+Interpolation of decay widths tabulated as a function of the scalar mass.
+
+The tables are sorted and deduplicated once when loaded, and truncated at the
+upper limit of validity of the calculation, such that a single sorted
+interpolation returns 0 below the table, and NaN above the upper limit.
+
+The text files remain the source of truth, but parsing them is slow. The
+prepared tables are therefore saved in binary `.npy` sidecars next to them,
+named after a hash of the text file and of the upper limit, which are
+memory-mapped when loaded, such that processes on the same node share them.
+Sidecars are only read at runtime: stale or missing ones are never used, and
+the text file is parsed instead. To (re)build all the sidecars, removing the
+stale ones, run:
+
+    python -m scalar_portal.decay.tabulated build
+
+To measure the cost per mass of the interpolation, run:
+
+    python -m scalar_portal.decay.tabulated
+"""
+
+from __future__ import division
+from __future__ import absolute_import
+
+import os
+import sys
+import glob
+import hashlib
+
+import numpy as np
+
+from ..data.files import atomic_write
+
+# Bump this when changing the layout of the sidecars.
+_format_version = 1
+
+
+# Interpolation methods:
+#   'linear': piecewise linear interpolation (`np.interp`);
+#   'pchip' : monotone piecewise cubic Hermite interpolation, which does not
+#             overshoot the tabulated values.
+interpolation_kinds = ['linear', 'pchip']
+
+def _sort_and_deduplicate(x, y):
+    'Sorts the table by increasing x, averaging the values of duplicate points.'
+    unique_x, inverse, counts = np.unique(x, return_inverse=True, return_counts=True)
+    unique_y = np.bincount(inverse, weights=y) / counts
+    return unique_x, unique_y
+
+def _prepare_table(table, upper_lim):
+    '''
+    Sorts the table and truncates it at the upper limit, such that masses above
+    it are outside of the table. Returns an array of shape (2, N).
+    '''
+    x, y = _sort_and_deduplicate(table[:,0], table[:,1])
+    # Make sure the upper limit makes sense
+    assert(x[-1] >= upper_lim)
+    below = x < upper_lim
+    y_lim = np.interp(upper_lim, x, y)
+    return np.array([np.append(x[below], upper_lim), np.append(y[below], y_lim)])
+
+def _sidecar_glob(path):
+    return os.path.splitext(path)[0] + '.*.npy'
+
+def sidecar_path(path, upper_lim):
+    '''
+    Path of the binary sidecar of the text table `path` truncated at
+    `upper_lim`, which changes whenever the content of the text file does.
+    '''
+    h = hashlib.sha1()
+    h.update(repr((_format_version, float(upper_lim))).encode())
+    with open(path, 'rb') as f:
+        h.update(f.read())
+    return '{}.{}.npy'.format(os.path.splitext(path)[0], h.hexdigest()[:16])
+
+def load_table(path, upper_lim):
+    '''
+    Returns the table in the text file `path`, sorted and truncated at
+    `upper_lim` (see `_prepare_table`).
+
+    The table is memory-mapped from its sidecar if it is up to date. Otherwise
+    the text file is parsed (the sidecar is only written by `build_sidecar`).
+    '''
+    sidecar = sidecar_path(path, upper_lim)
+    try:
+        table = np.load(sidecar, mmap_mode='r')
+        if table.dtype == np.float64 and table.ndim == 2 and table.shape[0] == 2:
+            return table
+    except (IOError, OSError, ValueError):
+        pass # Missing or corrupted
+    return _prepare_table(np.loadtxt(path), upper_lim)
+
+def build_sidecar(path, upper_lim):
+    '''
+    Writes the sidecar of the text table `path`, removing the stale ones.
+    Returns the path of the sidecar.
+    '''
+    sidecar = sidecar_path(path, upper_lim)
+    for old in glob.glob(_sidecar_glob(path)):
+        if old != sidecar:
+            os.remove(old)
+    with atomic_write(sidecar) as f:
+        np.save(f, _prepare_table(np.loadtxt(path), upper_lim))
+    return sidecar
+
+class WidthTable(object):
+    '''
+    Interpolates a width tabulated in the text file `path` (with the scalar mass
+    in the first column and the width in the second one, in any order). The
+    width is 0 below the first mass of the table, and NaN above `upper_lim`.
+    The table is loaded with `load_table`.
+    '''
+    def __init__(self, path, upper_lim, kind='linear'):
+        if kind not in interpolation_kinds:
+            raise(ValueError("Unknown interpolation method '{}' (must be one of {}).".format(
+                kind, ', '.join(interpolation_kinds))))
+        self._x, self._y = load_table(path, upper_lim)
+        self._kind = kind
+        if kind == 'pchip':
+            from scipy.interpolate import PchipInterpolator
+            self._pchip = PchipInterpolator(self._x, self._y, extrapolate=False)
+
+    @property
+    def kind(self):
+        return self._kind
+
+    @property
+    def domain(self):
+        return self._x[0], self._x[-1]
+
+    def __call__(self, mS):
+        mS = np.asarray(mS, dtype='float')
+        if self._kind == 'linear':
+            return np.interp(mS, self._x, self._y, left=0., right=float('nan'))
+        else:
+            # The PCHIP interpolator returns NaN outside of the table.
+            return np.where(mS < self._x[0], 0., self._pchip(mS))
+
+
+def _sources():
+    'Text tables used by the decay channels, with their upper limits.'
+    from . import two_pions, two_kaons
+    return [(two_pions._table_path, two_pions._upper_lim),
+            (two_kaons._table_path, two_kaons._upper_lim)]
+
+def _benchmark(n=10**6, repeat=5):
+    'Prints the cost per mass of the interpolation of the S -> π π and K K tables.'
+    import timeit
+    import scipy.interpolate as si
+    mS = np.random.RandomState(0).uniform(0, 2.2, n)
+    def report(name, func):
+        t = min(timeit.repeat(lambda: func(mS), number=1, repeat=repeat))
+        print('{:<32} {:8.2f} ns / mass'.format(name, 1e9 * t / n))
+    for path, upper_lim in _sources():
+        filename = os.path.basename(path)
+        table = np.loadtxt(path)
+        itp = si.interp1d(table[:,0], table[:,1], kind='linear', bounds_error=False,
+                          fill_value=0., assume_sorted=False)
+        report('{} interp1d + where'.format(filename),
+               lambda mS: np.where(mS <= upper_lim, itp(mS), float('nan')))
+        for kind in interpolation_kinds:
+            report('{} {}'.format(filename, kind), WidthTable(path, upper_lim, kind))
+    for path, upper_lim in _sources():
+        filename = os.path.basename(path)
+        parse = lambda: _prepare_table(np.loadtxt(path), upper_lim)
+        for name, func in [('parse text', parse), ('sidecar', lambda: load_table(path, upper_lim))]:
+            t = min(timeit.repeat(func, number=100, repeat=repeat)) / 100
+            print('{:<32} {:8.2f} us / load'.format('{} {}'.format(filename, name), 1e6 * t))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['build']:
+        for path, upper_lim in _sources():
+            print('Wrote {}.'.format(build_sidecar(path, upper_lim)))
+    else:
+        _benchmark()
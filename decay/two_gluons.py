@@ -7,7 +7,8 @@ import numpy as np
 
 from ..data.constants import *
 from ..data.particles import *
-from ..api.channel import DecayChannel, format_pythia_string
+from ..api.channel import DecayChannel, Interval, format_pythia_string
+from ..api.context import EvaluationContext
 
 
 # Number of dynamical flavors
@@ -52,7 +53,7 @@ def _E(mS, mu, Nf):
 _lower_validity_bound = 2.0 # GeV
 _upper_validity_bound = get_mass('B') # The b quark becomes dynamical above this threshold
 
-def normalized_decay_width(mS):
+def normalized_decay_width(mS, context=None):
     """
     Computes the decay width into gluons at NLO: S -> gg(g), gqq̄.
 
@@ -67,14 +68,22 @@ def normalized_decay_width(mS):
     formula to obtain the on-shell masses of c and b from the MSbar masses.
 
     The 1-loop contribution from the top quark is only 0.3% and is therefore neglected.
+
+    `context` is an optional `EvaluationContext` for `mS`, in which α_s is
+    memoized. `mS` must be the masses of the context (otherwise `ValueError`
+    is raised).
     """
-    mS = np.asarray(mS, dtype='float')
+    if context is None:
+        context = EvaluationContext(mS)
+    else:
+        context.check_mass(mS)
+    mS = context.mass
     valid = (mS >= _lower_validity_bound) & (mS < _upper_validity_bound)
-    F = _F(mS[valid])
+    F = context.memoize('two_gluons.F', _F, valid)
     w = np.zeros_like(mS, dtype='float')
     w[~valid] = float('nan')
     if np.any(valid):
-        aS = alpha_s(mu=mS[valid], nf=_nf)
+        aS = context.memoize(('alpha_s', _nf), lambda mu: alpha_s(mu=mu, nf=_nf), valid)
         # Compute the NLO correction from the real emissions and splitting of gluons.
         E = _E(mS[valid], mS[valid], _nf)
         # Evaluate the width
@@ -82,8 +91,8 @@ def normalized_decay_width(mS):
             * (mS[valid]**3/(8*pi*v**2)) * (1 + (aS/pi)*E)
     return w
 
-def normalized_total_width(mS):
-    return normalized_decay_width(mS)
+def normalized_total_width(mS, context=None):
+    return normalized_decay_width(mS, context)
 
 
 class TwoGluons(DecayChannel):
@@ -93,8 +102,16 @@ class TwoGluons(DecayChannel):
     def __init__(self):
         super(TwoGluons, self).__init__(2 * ['g'])
 
-    def normalized_width(self, mS):
-        return normalized_decay_width(mS)
+    def normalized_width(self, mS, context=None):
+        return normalized_decay_width(mS, context)
+
+    @property
+    def validity_interval(self):
+        return Interval(_lower_validity_bound, _upper_validity_bound, closed='left')
+
+    @property
+    def kernel_key(self):
+        return (type(self),)
 
     def pythia_string(self, branching_ratio, scalar_id):
         return format_pythia_string(
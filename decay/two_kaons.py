@@ -5,13 +5,18 @@ from __future__ import absolute_import
 
 import os
 import numpy as np
-import scipy.interpolate as si
 
-from ..api.channel import DecayChannel
+from ..api.channel import DecayChannel, Interval
+from .tabulated import WidthTable, interpolation_kinds
 
 
 _srcdir = os.path.dirname(__file__)
-# Load the table containing the normalized S -> K K decay width.
+# The calculation is not valid above 2.0 GeV, so we return NaN above this value.
+_upper_lim = 2.0 # GeV
+
+_table_path = os.path.join(_srcdir, 'winkler_K.txt')
+
+# Table containing the normalized S -> K K decay width.
 #   Source:
 #       Winkler, M.W., 2019.
 #       Decay and Detection of a Light Scalar Boson Mixing with the Higgs.
@@ -19,47 +24,68 @@ _srcdir = os.path.dirname(__file__)
 #   First column: scalar mass m_S in GeV.
 #   Second column: Γ(S -> K K) ratio evaluated at m_S.
 #   Note: The first column should not be assumed to be increasing.
-_decay_width_table = np.loadtxt(os.path.join(_srcdir, 'winkler_K.txt'))
-# The calculation is not valid above 2.0 GeV, so we return NaN above this value.
-_upper_lim = 2.0 # GeV
-# Make sure the upper limit makes sense
-assert(np.max(_decay_width_table[:,0]) >= _upper_lim)
-
-# Workaround for SciPy 0.15.1
-_itp = si.interp1d(
-    _decay_width_table[:,0], _decay_width_table[:,1],
-    kind='linear',
-    bounds_error=False,
-    fill_value=0.,
-    assume_sorted=False
-)
-
-def normalized_total_width(mS):
+#   The table is only loaded on first use, once for each interpolation method
+#   (see `tabulated.interpolation_kinds`), from its binary sidecar if it is up
+#   to date (see `tabulated.load_table`).
+_tables = {}
+
+def _get_table(kind='linear'):
+    try:
+        return _tables[kind]
+    except KeyError:
+        pass
+    table = WidthTable(_table_path, _upper_lim, kind)
+    _tables[kind] = table
+    return table
+
+def normalized_total_width(mS, kind='linear'):
     """
     Total decay width Γ(S → K K) = Γ(S → K⁰ Kbar⁰) + Γ(S → K⁺ K⁻).
     """
-    return np.where(mS <= _upper_lim, _itp(mS), float('nan'))
+    return _get_table(kind)(mS)
 
-def normalized_decay_width(mS):
+def normalized_decay_width(mS, kind='linear'):
     """
     Decay width to two kaons, for a specific final state.
         Γ(S → K⁰ Kbar⁰) = 1/2×Γ(S → K K)
         Γ(S → K⁺ K⁻   ) = 1/2×Γ(S → K K)
+    The table is interpolated using the method `kind` (either 'linear' or
+    'pchip').
     """
-    return (1/2) * normalized_total_width(np.asarray(mS, dtype='float'))
+    return (1/2) * normalized_total_width(np.asarray(mS, dtype='float'), kind)
 
 class TwoKaons(DecayChannel):
     '''
     Decay channel 'S -> K⁰ Kbar⁰' or 'S -> K⁺ K⁻'.
+
+    `interpolation` is the method used to interpolate the tabulated width
+    (see `normalized_decay_width`).
     '''
-    def __init__(self, final_state):
+    def __init__(self, final_state, interpolation='linear'):
         if final_state == 'neutral':
             children = ['K0', 'Kbar0']
         elif final_state == 'charged':
             children = ['K+', 'K-'   ]
         else:
             raise(ValueError("Final state must be either 'neutral' (K0 Kbar0) or 'charged' (K+ K-)."))
+        if interpolation not in interpolation_kinds:
+            raise(ValueError("Unknown interpolation method '{}'.".format(interpolation)))
         super(TwoKaons, self).__init__(children)
+        self._interpolation = interpolation
+
+    def normalized_width(self, mS, context=None):
+        return normalized_decay_width(mS, self._interpolation)
+
+    @property
+    def validity_interval(self):
+        return Interval(upper=_upper_lim, closed='right')
+
+    @property
+    def open_interval(self):
+        # The tabulated width vanishes below the first mass of the table.
+        return Interval(_get_table(self._interpolation).domain[0], closed='left')
 
-    def normalized_width(self, mS):
-        return normalized_decay_width(mS)
+    @property
+    def kernel_key(self):
+        # Both final states have the same width.
+        return (type(self), self._interpolation)
@@ -5,13 +5,18 @@ from __future__ import absolute_import
 
 import os
 import numpy as np
-import scipy.interpolate as si
 
-from ..api.channel import DecayChannel
+from ..api.channel import DecayChannel, Interval
+from .tabulated import WidthTable, interpolation_kinds
 
 
 _srcdir = os.path.dirname(__file__)
-# Load the table containing the normalized S -> π π decay width.
+# The calculation is not valid above 2.0 GeV, so we return NaN above this value.
+_upper_lim = 2.0 # GeV
+
+_table_path = os.path.join(_srcdir, 'winkler_pi.txt')
+
+# Table containing the normalized S -> π π decay width.
 #   Source:
 #       Winkler, M.W., 2019.
 #       Decay and Detection of a Light Scalar Boson Mixing with the Higgs.
@@ -19,33 +24,34 @@ _srcdir = os.path.dirname(__file__)
 #   First column: scalar mass m_S in GeV.
 #   Second column: Γ(S -> π π) ratio evaluated at m_S.
 #   Note: The first column should not be assumed to be increasing.
-_decay_width_table = np.loadtxt(os.path.join(_srcdir, 'winkler_pi.txt'))
-# The calculation is not valid above 2.0 GeV, so we return NaN above this value.
-_upper_lim = 2.0 # GeV
-# Make sure the upper limit makes sense
-assert(np.max(_decay_width_table[:,0]) >= _upper_lim)
-
-# Workaround for SciPy 0.15.1
-_itp = si.interp1d(
-    _decay_width_table[:,0], _decay_width_table[:,1],
-    kind='linear',
-    bounds_error=False,
-    fill_value=0.,
-    assume_sorted=False
-)
-
-def normalized_total_width(mS):
+#   The table is only loaded on first use, once for each interpolation method
+#   (see `tabulated.interpolation_kinds`), from its binary sidecar if it is up
+#   to date (see `tabulated.load_table`).
+_tables = {}
+
+def _get_table(kind='linear'):
+    try:
+        return _tables[kind]
+    except KeyError:
+        pass
+    table = WidthTable(_table_path, _upper_lim, kind)
+    _tables[kind] = table
+    return table
+
+def normalized_total_width(mS, kind='linear'):
     """
     Total decay width Γ(S → π π) = Γ(S → π⁰ π⁰) + Γ(S → π⁺ π⁻).
     """
-    return np.where(mS <= _upper_lim, _itp(mS), float('nan'))
+    return _get_table(kind)(mS)
 
-def normalized_decay_width(final_state, mS):
+def normalized_decay_width(final_state, mS, kind='linear'):
     """
     Decay width to two pions, for a specific final state.
     Possible values for `final_state`:
         `neutral`: Γ(S → π⁰ π⁰) = 1/3×Γ(S → π π)
         `charged`: Γ(S → π⁺ π⁻) = 2/3×Γ(S → π π)
+    The table is interpolated using the method `kind` (either 'linear' or
+    'pchip').
     """
     if final_state == 'neutral':
         fraction = 1/3
@@ -53,22 +59,41 @@ def normalized_decay_width(final_state, mS):
         fraction = 2/3
     else:
         raise(ValueError('Unknown final state {}.'.format(final_state)))
-    return fraction * normalized_total_width(np.asarray(mS, dtype='float'))
+    return fraction * normalized_total_width(np.asarray(mS, dtype='float'), kind)
 
 
 class TwoPions(DecayChannel):
     '''
     Decay channel 'S -> π⁰ π⁰' or 'S -> π⁺ π⁻'.
+
+    `interpolation` is the method used to interpolate the tabulated width
+    (see `normalized_decay_width`).
     '''
-    def __init__(self, final_state):
+    def __init__(self, final_state, interpolation='linear'):
         if final_state == 'neutral':
             children = ['pi0', 'pi0']
         elif final_state == 'charged':
             children = ['pi+', 'pi-']
         else:
             raise(ValueError("Final state must be either 'neutral' (2 pi0) or 'charged' (pi+ pi-)."))
+        if interpolation not in interpolation_kinds:
+            raise(ValueError("Unknown interpolation method '{}'.".format(interpolation)))
         super(TwoPions, self).__init__(children)
         self._final_state = final_state
+        self._interpolation = interpolation
+
+    def normalized_width(self, mS, context=None):
+        return normalized_decay_width(self._final_state, mS, self._interpolation)
+
+    @property
+    def validity_interval(self):
+        return Interval(upper=_upper_lim, closed='right')
+
+    @property
+    def open_interval(self):
+        # The tabulated width vanishes below the first mass of the table.
+        return Interval(_get_table(self._interpolation).domain[0], closed='left')
 
-    def normalized_width(self, mS):
-        return normalized_decay_width(self._final_state, mS)
+    @property
+    def kernel_key(self):
+        return (type(self), self._final_state, self._interpolation)
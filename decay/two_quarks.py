@@ -7,7 +7,8 @@ import numpy as np
 
 from ..data.constants import *
 from ..data.particles import *
-from ..api.channel import DecayChannel, format_pythia_string
+from ..api.channel import DecayChannel, Interval, format_pythia_string
+from ..api.context import EvaluationContext
 
 
 def _beta(mq, mS):
@@ -40,13 +41,12 @@ _thresholds = {
     'b': 2 * get_mass('B'),
 }
 
-def _normalized_decay_width_large_mass(q, mS):
+def _normalized_decay_width_large_mass(q, mS, mq, aS):
     """
     Approximates the decay width of S -> q qbar above the Hq Hq threshold
-    (where Hq=K for q=s, D for c, B for b).
+    (where Hq=K for q=s, D for c, B for b), given the running quark mass
+    m_q(mS) and α_s(mS).
     """
-    mq = msbar_mass(q, mu=mS, nf=_Nf)
-    aS = alpha_s(mu=mS, nf=_Nf)
     # It seems that Spira forgot the β³ in the paper, but it is needed to
     # reproduce figure 4, on page 213, so we put it back.
     # Moreover, to get the correct threshold in the full QCD, it makes sense to
@@ -55,14 +55,22 @@ def _normalized_decay_width_large_mass(q, mS):
     w = 3*mS*mq**2/(8*pi*v**2) * beta**3 * (1 + _Delta_QCD(aS, _Nf) + _Delta_t(aS, mq, mS))
     return w
 
-def normalized_decay_width(q, mS):
+def normalized_decay_width(q, mS, context=None):
     """
     Computes the decay width into two quarks: S -> q qbar, for q ∈ {s, c}.
 
     This computation is only valid above 2 GeV and below the b threshold. This
     function will return NaNs outside this range.
+
+    `context` is an optional `EvaluationContext` for `mS`, in which α_s and
+    the running quark masses are memoized. `mS` must be the masses of the
+    context (otherwise `ValueError` is raised).
     """
-    mS = np.asarray(mS, dtype='float')
+    if context is None:
+        context = EvaluationContext(mS)
+    else:
+        context.check_mass(mS)
+    mS = context.mass
     if q not in ['s', 'c']:
         raise(ValueError('S -> {} {}bar not implemented.'.format(q, q)))
     w = np.zeros_like(mS, dtype='float')
@@ -72,11 +80,17 @@ def normalized_decay_width(q, mS):
     # Only do the calculation for open channels
     mS_open = mS[open_channels]
     if np.any(open_channels):
-        w[open_channels] = _normalized_decay_width_large_mass(q, mS_open)
+        mq = context.memoize(('msbar_mass', q, _Nf),
+                             lambda mu: msbar_mass(q, mu=mu, nf=_Nf), open_channels)
+        aS = context.memoize(('alpha_s', _Nf),
+                             lambda mu: alpha_s(mu=mu, nf=_Nf), open_channels)
+        w[open_channels] = _normalized_decay_width_large_mass(q, mS_open, mq, aS)
     return w
 
-def normalized_total_width(mS):
-    return sum(normalized_decay_width(q, mS) for q in ['s', 'c'])
+def normalized_total_width(mS, context=None):
+    if context is None:
+        context = EvaluationContext(mS)
+    return sum(normalized_decay_width(q, mS, context) for q in ['s', 'c'])
 
 
 class TwoQuarks(DecayChannel):
@@ -89,8 +103,20 @@ class TwoQuarks(DecayChannel):
         super(TwoQuarks, self).__init__([flavor, flavor+'bar'])
         self._q = flavor
 
-    def normalized_width(self, mS):
-        return normalized_decay_width(self._q, mS)
+    def normalized_width(self, mS, context=None):
+        return normalized_decay_width(self._q, mS, context)
+
+    @property
+    def validity_interval(self):
+        return Interval(_lower_validity_bound, _thresholds['b'], closed='left')
+
+    @property
+    def open_interval(self):
+        return Interval(_thresholds[self._q], closed='left')
+
+    @property
+    def kernel_key(self):
+        return (type(self), self._q)
 
     def pythia_string(self, branching_ratio, scalar_id):
         id_q = get_pdg_id(self._q)
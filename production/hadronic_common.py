@@ -8,6 +8,7 @@ from ..data.particles import *
 from ..data.form_factors import *
 
 import numpy as np
+from collections import namedtuple
 
 
 _quark_masses = {
@@ -113,7 +114,11 @@ def MXT(q2, mX, mT, mQi, mQj, F):
 
 _matrix_elements[(5, +1)] = MXT
 
-def get_matrix_element(X, X1):
+def _get_matrix_element_parameters(X, X1):
+    """
+    Returns the matrix element function for the transition X -> X', and the
+    constant arguments (mX, mX1, mQi, mQj, F) it should be called with.
+    """
     mX  = get_mass(X )
     mX1 = get_mass(X1)
     F = get_form_factor(X, X1)
@@ -129,4 +134,33 @@ def get_matrix_element(X, X1):
     # This gives the right answer in the limit mQi >> mQj.
     if mQi == 0 and mQj == 0:
         mQi = 1
-    return lambda q2: M(q2, mX, mX1, mQi, mQj, F)
+    return M, (mX, mX1, mQi, mQj, F)
+
+def get_matrix_element(X, X1):
+    M, args = _get_matrix_element_parameters(X, X1)
+    return lambda q2: M(q2, *args)
+
+# Frozen kernels
+# --------------
+
+# Mass-independent constants of the transition X -> X' (masses, constant ξ and
+# matrix element), which only need to be resolved once for each transition.
+# `M` is the matrix element as a function of q², and `matrix_element` the
+# function of (q2, mX, mX1, mQi, mQj, F) it is built from.
+TransitionKernel = namedtuple('TransitionKernel',
+    ['mX', 'mX1', 'xi', 'M', 'matrix_element', 'mQi', 'mQj', 'F'])
+
+_transition_kernels = {}
+
+def get_transition_kernel(X, X1):
+    try:
+        return _transition_kernels[(X, X1)]
+    except KeyError:
+        pass
+    matrix_element, (mX, mX1, mQi, mQj, F) = _get_matrix_element_parameters(X, X1)
+    kernel = TransitionKernel(
+        mX=mX, mX1=mX1, xi=_get_xi(X, X1),
+        M=lambda q2: matrix_element(q2, mX, mX1, mQi, mQj, F),
+        matrix_element=matrix_element, mQi=mQi, mQj=mQj, F=F)
+    _transition_kernels[(X, X1)] = kernel
+    return kernel
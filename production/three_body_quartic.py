@@ -3,47 +3,304 @@
 from __future__ import division
 from __future__ import absolute_import
 
+from future.utils import viewitems
+
 from ..data.constants import *
 from ..data.particles import *
-from ..api.channel import ProductionChannel
+from ..data.form_factors import FormFactorStack
+from ..data.lru_cache import LRUCache
+from ..data.running import SplineTable
+from ..api.channel import ProductionChannel, Interval
 from . import hadronic_common as h
 
 import numpy as np
 import scipy.integrate
+from collections import OrderedDict
 from warnings import warn
 
 
-def normalized_decay_width(X, X1, mS, eps=1e-3):
-    '''
-    Computes the decay width for the process X -> X' S S, divided by the
-    coefficient α.
-    '''
-    mS = np.asarray(mS, dtype='float')
-    mX = get_mass(X)
-    mX1 = get_mass(X1)
-    xi = h._get_xi(X, X1)
-    # Part of the prefactor has been absorbed in the normalized amplitude.
-    prefactor = xi**2 / (512*pi**3 * mX**3 * v**2 * M_h**4)
-    # Integration
-    lower_bound = 4*mS**2
-    upper_bound = (mX-mX1)**2
+# Integration methods for the 3-body width:
+#   'quad' : adaptive quadrature with `scipy.integrate.quad`, one mass at a time;
+#   'gauss': vectorized Gauss-Legendre quadrature over all masses at once,
+#            falling back to 'quad' where its error estimate is too large.
+_integration_methods = ['quad', 'gauss']
+
+_gauss_legendre_rules = {}
+
+def _gauss_legendre(n):
+    'Nodes and weights of the n-point Gauss-Legendre rule on [-1, 1].'
+    try:
+        return _gauss_legendre_rules[n]
+    except KeyError:
+        rule = np.polynomial.legendre.leggauss(n)
+        _gauss_legendre_rules[n] = rule
+        return rule
+
+def _gauss_legendre_order(eps):
+    """
+    Number of nodes such that the n-point rule reaches roughly the relative
+    accuracy `eps`. This was determined empirically for all the channels (the
+    error decreases by about one order of magnitude every 2 nodes).
+    """
+    return max(4, int(np.ceil(2*np.log10(1/eps))) + 2)
+
+def _integrate_gauss(integrand, mS, low, high, n):
+    """
+    Integrates `integrand(q2, mS)` between `low` and `high` using the n-point
+    Gauss-Legendre rule, for all masses at once.
+
+    Both ends of the phase space give a square-root behaviour, which is
+    smoothed out by the change of variable q² = (a+b)/2 - (b-a)/2 cos(θ).
+    """
+    t, w = _gauss_legendre(n)
+    theta = (pi/2) * (1 + t)
+    a, b = low[:,np.newaxis], high[:,np.newaxis]
+    q2 = (a+b)/2 - (b-a)/2 * np.cos(theta)
+    jacobian = (pi/2) * (b-a)/2 * np.sin(theta)
+    with np.errstate(invalid='ignore'):
+        f = integrand(q2, mS[:,np.newaxis])
+    return np.sum(w * jacobian * f, axis=-1)
+
+def _integrate_quad(integrand, mS, low, high, eps):
+    """
+    Integrates `integrand(q2, mS)` between `low` and `high` using adaptive
+    quadrature, one mass at a time.
+
+    For light scalars, the integrand rises steeply just above the lower bound,
+    which makes `quad` underestimate its error. We therefore integrate over
+    u = sqrt(q² - low) instead, in which the integrand is smooth.
+    """
+    def integral(_mS, _low, _high):
+        val, _ = scipy.integrate.quad(lambda u: 2*u * integrand(_low + u**2, _mS),
+                                      0, np.sqrt(_high - _low), epsabs=0, epsrel=eps)
+        return val
+    return np.array([integral(*args) for args in zip(mS, low, high)], dtype='float')
+
+def _get_integrand(kernel):
+    'Returns the integrand of the width over q², as a function of (q2, mS).'
+    mX, mX1, M = kernel.mX, kernel.mX1, kernel.M
     def E2(q2):
         return np.sqrt(q2) / 2
     def E3(q2):
         return (mX**2 - q2 - mX1**2) / (2*np.sqrt(q2))
-    M = h.get_matrix_element(X, X1)
     def integrand(q2, mS):
         A = M(q2)
         return np.real(A*np.conj(A)) * np.sqrt(E2(q2)**2 - mS**2) * np.sqrt(E3(q2)**2 - mX1**2)
+    return integrand
+
+def _get_prefactor(mX, xi):
+    # Part of the prefactor has been absorbed in the normalized amplitude.
+    return xi**2 / (512*pi**3 * mX**3 * v**2 * M_h**4)
+
+def _normalized_decay_width(kernel, mS, eps=1e-3, method='gauss'):
+    'Same as `normalized_decay_width`, for a `hadronic_common.TransitionKernel`.'
+    if method not in _integration_methods:
+        raise(ValueError("Unknown integration method '{}'.".format(method)))
+    mS = np.asarray(mS, dtype='float')
+    mX, mX1 = kernel.mX, kernel.mX1
+    prefactor = _get_prefactor(mX, kernel.xi)
+    integrand = _get_integrand(kernel)
     closing_mass = (mX - mX1) / 2
-    def width(mS, low, high):
-        if mS < closing_mass:
-            val, _ = scipy.integrate.quad(lambda q2: integrand(q2, mS),
-                                          low, high, epsabs=0, epsrel=eps)
-            return prefactor * val
-        else:
-            return 0.
-    return np.vectorize(width, otypes=[float])(mS, lower_bound, upper_bound)
+    w = np.zeros_like(mS)
+    open_ch = mS < closing_mass
+    mS_open = mS[open_ch]
+    # Integration bounds
+    lower_bound = 4*mS_open**2
+    upper_bound = np.full_like(mS_open, (mX-mX1)**2)
+    if method == 'gauss':
+        n = _gauss_legendre_order(eps)
+        coarse = _integrate_gauss(integrand, mS_open, lower_bound, upper_bound, n  )
+        val    = _integrate_gauss(integrand, mS_open, lower_bound, upper_bound, 2*n)
+        with np.errstate(invalid='ignore'):
+            failed = ~(np.abs(val - coarse) <= eps * np.abs(val))
+        if np.any(failed):
+            val[failed] = _integrate_quad(integrand, mS_open[failed],
+                                          lower_bound[failed], upper_bound[failed], eps)
+    else:
+        val = _integrate_quad(integrand, mS_open, lower_bound, upper_bound, eps)
+    w[open_ch] = prefactor * val
+    return w
+
+def normalized_decay_width(X, X1, mS, eps=1e-3, method='gauss'):
+    '''
+    Computes the decay width for the process X -> X' S S, divided by the
+    coefficient α.
+
+    `eps` is the relative accuracy target for the numerical integration, which
+    is performed using `method` (either 'gauss' or 'quad').
+    '''
+    return _normalized_decay_width(h.get_transition_kernel(X, X1), mS,
+                                   eps=eps, method=method)
+
+
+class StackedKernels(object):
+    """
+    Evaluates `_normalized_decay_width` with the 'gauss' method for several
+    transition kernels at once.
+
+    All the widths are integrated in a single vectorized quadrature pass over a
+    (channels × masses × nodes) array. The matrix elements are evaluated for
+    each group of channels sharing the same matrix element function, with their
+    constants and form factors packed along the channel axis (see
+    `FormFactorStack`). To bound the memory usage, the masses are split into
+    chunks such that the arrays contain at most `max_nodes` elements.
+
+    As for a single channel, the widths are integrated with n and 2n nodes, and
+    the masses for which they differ by more than `eps` are integrated again
+    with 'quad'.
+    """
+    _constants = ['mX', 'mX1', 'mQi', 'mQj']
+
+    def __init__(self, kernels, max_nodes=2**20):
+        self._kernels = kernels
+        self._max_nodes = max_nodes
+        mX, mX1, xi = [np.array([getattr(kernel, name) for kernel in kernels], dtype='float')
+                       for name in ['mX', 'mX1', 'xi']]
+        self._closing_mass = (mX - mX1) / 2
+        self._upper_bound = (mX - mX1)**2
+        self._prefactor = _get_prefactor(mX, xi)
+        groups = OrderedDict()
+        for i, kernel in enumerate(kernels):
+            groups.setdefault(kernel.matrix_element, []).append(i)
+        self._groups = []
+        for matrix_element, indices in viewitems(groups):
+            group = [kernels[i] for i in indices]
+            constants = [np.array([getattr(kernel, name) for kernel in group],
+                                  dtype='float')[:,np.newaxis,np.newaxis]
+                         for name in self._constants]
+            form_factors = FormFactorStack([kernel.F for kernel in group])
+            self._groups.append((np.array(indices), matrix_element, constants, form_factors))
+
+    def _integrand(self, q2, mS):
+        """
+        Integrand for all channels, where `q2` has shape (channels, masses,
+        nodes) and `mS` shape (masses, 1).
+        """
+        f = np.empty(q2.shape)
+        for indices, matrix_element, constants, form_factors in self._groups:
+            mX, mX1, mQi, mQj = constants
+            q2_group = q2[indices]
+            def F(q2):
+                return form_factors(q2, aligned=True)
+            A = matrix_element(q2_group, mX, mX1, mQi, mQj, F)
+            E2 = np.sqrt(q2_group) / 2
+            E3 = (mX**2 - q2_group - mX1**2) / (2*np.sqrt(q2_group))
+            f[indices] = np.real(A*np.conj(A)) * np.sqrt(E2**2 - mS**2) * np.sqrt(E3**2 - mX1**2)
+        return f
+
+    def _integrate_gauss(self, mS, low, n):
+        'Same as `_integrate_gauss`, for all channels at once.'
+        t, w = _gauss_legendre(n)
+        theta = (pi/2) * (1 + t)
+        a, b = low[:,np.newaxis], self._upper_bound[:,np.newaxis,np.newaxis]
+        q2 = (a+b)/2 - (b-a)/2 * np.cos(theta)
+        jacobian = (pi/2) * (b-a)/2 * np.sin(theta)
+        with np.errstate(invalid='ignore'):
+            f = self._integrand(q2, mS[:,np.newaxis])
+        return np.sum(w * jacobian * f, axis=-1)
+
+    def _evaluate(self, mS, eps):
+        'Evaluates the widths for the 1-dimensional array of masses `mS`.'
+        open_ch = mS < self._closing_mass[:,np.newaxis]
+        lower_bound = 4*mS**2
+        n = _gauss_legendre_order(eps)
+        coarse = self._integrate_gauss(mS, lower_bound, n  )
+        val    = self._integrate_gauss(mS, lower_bound, 2*n)
+        with np.errstate(invalid='ignore'):
+            failed = open_ch & ~(np.abs(val - coarse) <= eps * np.abs(val))
+        for i in np.flatnonzero(np.any(failed, axis=1)):
+            f = failed[i]
+            upper_bound = np.full(np.count_nonzero(f), self._upper_bound[i])
+            val[i,f] = _integrate_quad(_get_integrand(self._kernels[i]), mS[f],
+                                       lower_bound[f], upper_bound, eps)
+        return np.where(open_ch, self._prefactor[:,np.newaxis] * val, 0.)
+
+    def __call__(self, mS, eps=1e-3):
+        """
+        Returns the normalized widths as an array of shape
+        `(len(kernels),) + mS.shape`.
+        """
+        mS = np.asarray(mS, dtype='float')
+        flat_mS = mS.ravel()
+        n_kernels = len(self._kernels)
+        w = np.empty((n_kernels, flat_mS.size))
+        nodes_per_mass = n_kernels * 2*_gauss_legendre_order(eps)
+        chunk_size = max(1, self._max_nodes // nodes_per_mass)
+        for start in range(0, flat_mS.size, chunk_size):
+            chunk = slice(start, start + chunk_size)
+            w[:,chunk] = self._evaluate(flat_mS[chunk], eps)
+        return w.reshape((n_kernels,) + mS.shape)
+
+# Each selection (and order) of channels has its own stack, so only the most
+# recently used ones are kept.
+_stacked_kernels = LRUCache(maxsize=16)
+
+def get_stacked_kernels(transitions):
+    """
+    Returns the (memoized) `StackedKernels` for the given list of transitions
+    (X, X').
+    """
+    key = tuple(transitions)
+    return _stacked_kernels.get_or_compute(
+        key, lambda: StackedKernels([h.get_transition_kernel(X, X1) for X, X1 in key]))
+
+
+# The tables are parametrized by the distance d = closing_mass - mS to the
+# kinematic threshold, and cover d ∈ [_table_min_fraction * closing_mass,
+# closing_mass]. Closer to the threshold, the width is computed directly.
+_table_min_fraction = 1e-6
+
+# The knots are integrated with a better accuracy than the one required for the
+# interpolation, so that the integration error does not limit the refinement.
+_table_integration_factor = 10
+
+_width_tables = {}
+
+def get_width_table(X, X1, table_eps=1e-6, table_size=512):
+    """
+    Returns the (lazily built) interpolation table for the normalized width of
+    X -> X' S S as a function of the distance d to the kinematic threshold.
+
+    The table is a cubic spline in (log(d), log(width)), in which the width is
+    close to linear near the threshold. The knots are adaptively refined until
+    the relative interpolation error is below `table_eps`, or until the table
+    contains `table_size` knots.
+    """
+    key = (X, X1, table_eps, table_size)
+    try:
+        return _width_tables[key]
+    except KeyError:
+        pass
+    closing_mass = (get_mass(X) - get_mass(X1)) / 2
+    if closing_mass <= 0:
+        raise(ValueError('The decay {} -> {} S S is kinematically forbidden.'.format(X, X1)))
+    eps = table_eps / _table_integration_factor
+    table = SplineTable(
+        lambda d: normalized_decay_width(X, X1, closing_mass - d, eps=eps),
+        mu_min=_table_min_fraction*closing_mass, mu_max=closing_mass,
+        rtol=table_eps, max_knots=table_size, vectorized=True)
+    _width_tables[key] = table
+    return table
+
+def tabulated_decay_width(X, X1, mS, eps=1e-3, table_eps=1e-6, table_size=512):
+    '''
+    Same as `normalized_decay_width`, but interpolated from a precomputed table
+    (see `get_width_table`). Masses not covered by the table are integrated
+    directly with relative accuracy `eps`.
+    '''
+    mS = np.asarray(mS, dtype='float')
+    closing_mass = (get_mass(X) - get_mass(X1)) / 2
+    table = get_width_table(X, X1, table_eps, table_size)
+    d = closing_mass - mS
+    d_min, d_max = table.domain
+    inside = (d >= d_min) & (d <= d_max)
+    w = np.zeros_like(mS)
+    if np.any(inside):
+        w[inside] = table(d[inside])
+    outside = ~inside & (d > 0)
+    if np.any(outside):
+        w[outside] = normalized_decay_width(X, X1, mS[outside], eps=eps)
+    return w
 
 
 class ThreeBodyQuartic(ProductionChannel):
@@ -55,9 +312,16 @@ class ThreeBodyQuartic(ProductionChannel):
     mixing), then a weak eigenstate (either particle or antiparticle) must be
     specified separately.
 
-    `eps` is the relative accuracy target for the numerical integration.
+    `eps` is the relative accuracy target for the numerical integration, and
+    `method` the integration method (see `normalized_decay_width`).
+
+    If `tabulate` is true, the width is instead interpolated from a table built
+    on first use, with relative accuracy `table_eps` and at most `table_size`
+    knots (see `get_width_table`). This is much faster when evaluating the
+    width for many masses, e.g. for plots or parameter scans.
     '''
-    def __init__(self, H, H1, weak_eigenstate=None, eps=1e-3):
+    def __init__(self, H, H1, weak_eigenstate=None, eps=1e-3, method='gauss',
+                 tabulate=False, table_eps=1e-6, table_size=512):
         if weak_eigenstate is None:
             weak_eigenstate = H
         if not (is_meson(weak_eigenstate) and is_meson(H1)):
@@ -68,10 +332,51 @@ class ThreeBodyQuartic(ProductionChannel):
             self._X1 = get_qcd_state(H1)
         except:
             raise(ValueError('The charges of {} and {} must be specified.'.format(weak_eigenstate, H1)))
+        if method not in _integration_methods:
+            raise(ValueError("Unknown integration method '{}'.".format(method)))
         self._eps = eps
+        self._method = method
+        self._tabulate = tabulate
+        self._table_eps = table_eps
+        self._table_size = table_size
+        self._kernel = h.get_transition_kernel(self._X, self._X1)
+
+    def normalized_width(self, mS, context=None):
+        if self._tabulate:
+            return tabulated_decay_width(self._X, self._X1, mS, eps=self._eps,
+                                         table_eps=self._table_eps,
+                                         table_size=self._table_size)
+        return _normalized_decay_width(self._kernel, mS, eps=self._eps,
+                                       method=self._method)
+
+    @classmethod
+    def normalized_widths(cls, channels, mS, context=None):
+        # Subclasses overriding `normalized_width` are evaluated one by one.
+        if cls.normalized_width != ThreeBodyQuartic.normalized_width:
+            return super(ThreeBodyQuartic, cls).normalized_widths(channels, mS, context)
+        # Channels integrated with the 'gauss' method are evaluated together for
+        # each accuracy target.
+        widths = len(channels) * [None]
+        batches = OrderedDict()
+        for i, ch in enumerate(channels):
+            if ch._method == 'gauss' and not ch._tabulate:
+                batches.setdefault(ch._eps, []).append(i)
+            else:
+                widths[i] = ch.normalized_width(mS, context)
+        for eps, indices in viewitems(batches):
+            stacked = get_stacked_kernels([(channels[i]._X, channels[i]._X1) for i in indices])
+            for i, w in zip(indices, stacked(mS, eps)):
+                widths[i] = w
+        return widths
+
+    @property
+    def open_interval(self):
+        return Interval(upper=(self._kernel.mX - self._kernel.mX1) / 2)
 
-    def normalized_width(self, mS):
-        return normalized_decay_width(self._X, self._X1, mS, eps=self._eps)
+    @property
+    def kernel_key(self):
+        return (type(self), self._X, self._X1, self._eps, self._method,
+                self._tabulate, self._table_eps, self._table_size)
 
     def pythia_string(self, *args, **kwargs):
         warn('Assuming pure phase-space decay for {}'.format(str(self)))
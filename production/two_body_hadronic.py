@@ -3,35 +3,94 @@
 from __future__ import division
 from __future__ import absolute_import
 
+from future.utils import viewitems
+
 from ..data.constants import *
 from ..data.particles import *
-from ..api.channel import ProductionChannel
+from ..data.form_factors import FormFactorStack
+from ..data.lru_cache import LRUCache
+from ..api.channel import ProductionChannel, Interval
 from . import hadronic_common as h
 
 import numpy as np
+from collections import OrderedDict
 
 
-def _available_mass(Y, Y1):
-    return get_mass(Y) - get_mass(Y1)
+def _normalized_decay_width(kernel, mS):
+    'Same as `normalized_decay_width`, for a `hadronic_common.TransitionKernel`.'
+    mS = np.asarray(mS, dtype='float')
+    mY, mY1 = kernel.mX, kernel.mX1
+    kin_open = mS < mY - mY1
+    pS = h._momentum(mY, mY1, mS)
+    with np.errstate(invalid='ignore'):
+        A = kernel.M(mS**2)
+        w = ( kernel.xi**2 * np.real(A*np.conj(A)) * pS ) / ( 32*pi * v**2 * mY**2 )
+    return np.where(kin_open, w, 0.)
 
 def normalized_decay_width(Y, Y1, mS):
     """
     Computes the decay width for the process Y_q -> S Y'_q', divided by the
     mixing angle θ.
     """
-    kin_open = mS < _available_mass(Y, Y1)
-    mS = np.asarray(mS, dtype='float')
-    mu = mS
-    M = h.get_matrix_element(Y, Y1)
-    xi = h._get_xi(Y, Y1)
-    _, Qi, _ = h._get_quark_transition(Y, Y1)
-    mY  = get_mass(Y )
-    mY1 = get_mass(Y1)
-    pS = h._momentum(mY, mY1, mS)
-    with np.errstate(invalid='ignore'):
-        A = M(mS**2)
-        w = ( xi**2 * np.real(A*np.conj(A)) * pS ) / ( 32*pi * v**2 * mY**2 )
-    return np.where(kin_open, w, 0.)
+    return _normalized_decay_width(h.get_transition_kernel(Y, Y1), mS)
+
+
+class StackedKernels(object):
+    """
+    Evaluates `_normalized_decay_width` for several transition kernels at once.
+
+    The kernels are grouped by matrix element (i.e. by spin and parity of the
+    final meson), and the constants of each group are packed into arrays along
+    a channel axis (including the form factors, see `FormFactorStack`). The
+    widths of each group are then computed as a single (channels × masses)
+    broadcast operation, with the same arithmetic as the per-channel path, such
+    that the results are identical.
+    """
+    _constants = ['mX', 'mX1', 'xi', 'mQi', 'mQj']
+
+    def __init__(self, kernels):
+        self._n_kernels = len(kernels)
+        groups = OrderedDict()
+        for i, kernel in enumerate(kernels):
+            groups.setdefault(kernel.matrix_element, []).append(i)
+        self._groups = []
+        for matrix_element, indices in viewitems(groups):
+            group = [kernels[i] for i in indices]
+            constants = [np.array([getattr(kernel, name) for kernel in group], dtype='float')
+                         for name in self._constants]
+            form_factors = FormFactorStack([kernel.F for kernel in group])
+            self._groups.append((np.array(indices), matrix_element, constants, form_factors))
+
+    def __call__(self, mS):
+        """
+        Returns the normalized widths as an array of shape
+        `(len(kernels),) + mS.shape`.
+        """
+        mS = np.asarray(mS, dtype='float')
+        w = np.empty((self._n_kernels,) + mS.shape)
+        channel_axis = (-1,) + mS.ndim*(1,)
+        for indices, matrix_element, constants, form_factors in self._groups:
+            mY, mY1, xi, mQi, mQj = [c.reshape(channel_axis) for c in constants]
+            kin_open = mS < mY - mY1
+            pS = h._momentum(mY, mY1, mS)
+            with np.errstate(invalid='ignore'):
+                A = matrix_element(mS**2, mY, mY1, mQi, mQj, form_factors)
+                w_group = ( xi**2 * np.real(A*np.conj(A)) * pS ) / ( 32*pi * v**2 * mY**2 )
+            w[indices] = np.where(kin_open, w_group, 0.)
+        return w
+
+# Each selection (and order) of channels has its own stack, so only the most
+# recently used ones are kept.
+_stacked_kernels = LRUCache(maxsize=16)
+
+def get_stacked_kernels(transitions):
+    """
+    Returns the (memoized) `StackedKernels` for the given list of transitions
+    (Y, Y').
+    """
+    key = tuple(transitions)
+    return _stacked_kernels.get_or_compute(
+        key, lambda: StackedKernels([h.get_transition_kernel(Y, Y1) for Y, Y1 in key]))
 
 
 class TwoBodyHadronic(ProductionChannel):
@@ -53,6 +112,23 @@ class TwoBodyHadronic(ProductionChannel):
             self._Y1 = get_qcd_state(H1)
         except:
             raise(ValueError('The charges of {} and {} must be specified.'.format(weak_eigenstate, H1)))
+        self._kernel = h.get_transition_kernel(self._Y, self._Y1)
+
+    def normalized_width(self, mS, context=None):
+        return _normalized_decay_width(self._kernel, mS)
+
+    @classmethod
+    def normalized_widths(cls, channels, mS, context=None):
+        # Subclasses overriding `normalized_width` are evaluated one by one.
+        if cls.normalized_width != TwoBodyHadronic.normalized_width:
+            return super(TwoBodyHadronic, cls).normalized_widths(channels, mS, context)
+        stacked = get_stacked_kernels([(ch._Y, ch._Y1) for ch in channels])
+        return list(stacked(mS))
+
+    @property
+    def open_interval(self):
+        return Interval(upper=self._kernel.mX - self._kernel.mX1)
 
-    def normalized_width(self, mS):
-        return normalized_decay_width(self._Y, self._Y1, mS)
+    @property
+    def kernel_key(self):
+        return (type(self), self._Y, self._Y1)
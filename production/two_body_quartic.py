@@ -5,10 +5,11 @@ from __future__ import absolute_import
 
 from ..data.constants import *
 from ..data.particles import *
-from ..api.channel import ProductionChannel
+from ..api.channel import ProductionChannel, Interval
 from .hadronic_common import xi
 
 import numpy as np
+from collections import namedtuple
 
 
 # Heavy meson decay constants in GeV
@@ -38,22 +39,39 @@ def _get_quark_transitions(X):
 def _get_xi(X):
     return xi(*_get_quark_transitions(X))
 
-def _available_mass(X):
-    return get_mass(X) / 2
+# Mass-independent constants of the decay X -> S S: the mass of X, and the width
+# for mS = 0 (i.e. without the phase-space suppression β).
+_Kernel = namedtuple('_Kernel', ['mX', 'w0'])
 
-def normalized_decay_width(X, mS):
-    '''
-    Computes the decay width for the process X -> S S, divided by the
-    coefficient α.
-    '''
-    mS = np.asarray(mS, dtype='float')
+_kernels = {}
+
+def _get_kernel(X):
+    try:
+        return _kernels[X]
+    except KeyError:
+        pass
     mX = get_mass(X)
     fX = _get_decay_constant(X)
     xi_Q = _get_xi(X)
+    w0 = (mX**3 / v**2) * (xi_Q**2 * fX**2) / (128*pi * M_h**4)
+    _kernels[X] = _Kernel(mX, w0)
+    return _kernels[X]
+
+def _normalized_decay_width(kernel, mS):
+    'Same as `normalized_decay_width`, for a kernel returned by `_get_kernel`.'
+    mS = np.asarray(mS, dtype='float')
+    mX = kernel.mX
     with np.errstate(invalid='ignore'):
         beta = np.sqrt(1 - (2*mS/mX)**2)
-    w = (mX**3 / v**2) * (xi_Q**2 * fX**2) / (128*pi * M_h**4) * beta
-    return np.where(mS < _available_mass(X), w, 0.)
+    w = kernel.w0 * beta
+    return np.where(mS < mX / 2, w, 0.)
+
+def normalized_decay_width(X, mS):
+    '''
+    Computes the decay width for the process X -> S S, divided by the
+    coefficient α.
+    '''
+    return _normalized_decay_width(_get_kernel(X), mS)
 
 
 class TwoBodyQuartic(ProductionChannel):
@@ -74,6 +92,15 @@ class TwoBodyQuartic(ProductionChannel):
         if get_charge(weak_eigenstate) != 0:
             raise(ValueError('X -> S S is only possible if X is neutral (X = {}).'
                              .format(weak_eigenstate)))
+        self._kernel = _get_kernel(self._X)
+
+    def normalized_width(self, mS, context=None):
+        return _normalized_decay_width(self._kernel, mS)
+
+    @property
+    def open_interval(self):
+        return Interval(upper=self._kernel.mX / 2)
 
-    def normalized_width(self, mS):
-        return normalized_decay_width(self._X, mS)
+    @property
+    def kernel_key(self):
+        return (type(self), self._X)
@@ -68,6 +68,25 @@ def test_enable_disable():
     assert_equals(set(ps.list_enabled()), set(ps.list_available()))
     assert_raises(ValueError, lambda: ps.enable('S -> tau+ tau-'))
 
+def test_version():
+    channels, groups = _make_channels_and_groups()
+    ps = ActiveProcesses(channels, groups)
+    v = ps.version
+    ps.disable('S -> g g') # No change
+    ps.disable_all()
+    assert_equals(ps.version, v)
+    ps.enable('S -> l+ l-')
+    assert(ps.version > v)
+    v = ps.version
+    ps.enable('S -> e+ e-') # Already enabled
+    assert_equals(ps.version, v)
+    assert_equals(ps.enabled_set(), frozenset(['S -> e+ e-', 'S -> mu+ mu-']))
+    ps.disable('S -> mu+ mu-')
+    assert(ps.version > v)
+    v = ps.version
+    ps.enable_all()
+    assert(ps.version > v)
+
 def test_recursion():
     channels, groups = _make_channels_and_groups()
     groups['AllQCD'] = ['S -> pi pi', 'pQCD']
@@ -94,3 +113,37 @@ def test_get_active_processes():
     assert_equals(sum(isinstance(el, Leptonic ) for el in lst), 1)
     assert_equals(sum(isinstance(el, TwoQuarks) for el in lst), 2)
     assert_equals(sum(isinstance(el, TwoGluons) for el in lst), 1)
+    # The sorted list is cached, but callers get their own copy.
+    lst.pop()
+    assert_equals(len(ps.get_active_processes()), 4)
+    assert_equals(ps.get_active_processes(), sorted(lst + [ps.get_active_processes()[-1]]))
+    ps.disable('S -> g g')
+    assert_equals([str(ch) for ch in ps.get_active_processes()],
+                  ['S -> e+ e-', 'S -> s sbar', 'S -> c cbar'])
+    ps.disable_all()
+    assert_equals(ps.get_active_processes(), [])
+    # Processes of any group, whether active or not
+    assert_equals([str(ch) for ch in ps.get_processes(ps.get_mask('pQCD'))],
+                  ['S -> s sbar', 'S -> c cbar', 'S -> g g'])
+    assert_equals(ps.get_processes(0), [])
+
+def test_masks():
+    channels, groups = _make_channels_and_groups()
+    ps = ActiveProcesses(channels, groups)
+    assert_equals(ps.selection_mask, 0)
+    names = ps.list_available()
+    assert_equals(ps.get_mask('S -> e+ e-'), 1 << names.index('S -> e+ e-'))
+    assert_equals(ps.get_mask('pQCD'), ps.get_mask('S -> q qbar') | ps.get_mask('S -> g g'))
+    assert_equals(ps.get_mask('All'), (1 << len(names)) - 1)
+    ps.enable('S -> l+ l-')
+    assert_equals(ps.selection_mask, ps.get_mask('S -> l+ l-'))
+    ps.enable('pQCD')
+    ps.disable('S -> q qbar')
+    assert_equals(ps.selection_mask, ps.get_mask('S -> l+ l-') | ps.get_mask('S -> g g'))
+    assert_raises(ValueError, lambda: ps.get_mask('S -> tau+ tau-'))
+    # Invalid groups
+    groups['Loop'] = ['S -> g g', 'Loop']
+    assert_raises(ValueError, lambda: ActiveProcesses(channels, groups))
+    del groups['Loop']
+    groups['Unknown'] = ['S -> tau+ tau-']
+    assert_raises(ValueError, lambda: ActiveProcesses(channels, groups))
@@ -8,8 +8,32 @@ import numpy as np
 from ..api.branching_ratios import *
 from ..decay.leptonic import Leptonic
 from ..decay.two_gluons import TwoGluons
+from ..decay.two_quarks import TwoQuarks
+from ..decay.two_pions import TwoPions
 from ..production.two_body_hadronic import TwoBodyHadronic
 from ..production.two_body_quartic import TwoBodyQuartic
+from ..production.three_body_quartic import ThreeBodyQuartic
+
+def _counting(channel_type, calls):
+    '''
+    Subclass of `channel_type` which records the channel and the masses for
+    each evaluation of `normalized_width`. Since it overrides
+    `normalized_width`, its channels are evaluated one by one.
+    '''
+    class Counting(channel_type):
+        def normalized_width(self, mS, context=None):
+            calls.append((str(self), np.array(mS)))
+            return super(Counting, self).normalized_width(mS, context)
+    return Counting
+
+def _assert_widths(br, channels, mS, couplings, epsilon=0):
+    'Compares the widths to the ones computed separately for each channel.'
+    for ch in channels:
+        ref = ch.width(mS, couplings)
+        w = br.widths[str(ch)]
+        assert_equals(w.shape, np.shape(mS))
+        assert(np.all((np.abs(w - ref) <= epsilon * np.abs(ref)) |
+                      (np.isnan(w) & np.isnan(ref))))
 
 def test_decay_branching_ratios():
     channels = [Leptonic(l) for l in ['e', 'mu', 'tau']]
@@ -111,3 +135,103 @@ def test_broadcasting():
         channels, [0., 0.5, 1.], {'theta': [0.1, 1], 'alpha': 0}))
     assert_raises(ValueError, lambda: ProductionBranchingRatios(
         channels, 1., {'theta': [0.1, 0.25, 1], 'alpha': [0.1, 0.5]}))
+
+def test_shared_kernels():
+    calls = []
+    CountingHadronic = _counting(TwoBodyHadronic, calls)
+    channels = [CountingHadronic('B+', 'K+'), CountingHadronic('B0', 'K0'),
+                CountingHadronic('B+', 'K*+'), CountingHadronic('B0', 'K*0'),
+                CountingHadronic('K_L0', 'pi0', weak_eigenstate='K0'),
+                CountingHadronic('K_S0', 'pi0', weak_eigenstate='K0')]
+    mS = np.array([0.1, 0.5, 1, 2])
+    br = ProductionBranchingRatios(channels, mS, {'theta': 0.5})
+    assert_equals(len(calls), 3)
+    for ch in channels:
+        assert(np.all(br.widths[str(ch)] == ch.width(mS, {'theta': 0.5})))
+        assert(np.all(br.branching_ratios[str(ch)] == ch.branching_ratio(mS, {'theta': 0.5})))
+
+def test_domain_dispatch():
+    masses = []
+    CountingHadronic = _counting(TwoBodyHadronic, masses)
+    channels = [CountingHadronic('B+', 'K+'), CountingHadronic('K+', 'pi+')]
+    mS = np.array([0.1, 0.5, 1, 6, np.nan])
+    br = ProductionBranchingRatios(channels, mS, {'theta': 1})
+    # Channels of the same type are only evaluated for the masses where at
+    # least one of them is open.
+    assert_equals([ch for ch, _ in masses], ['B+ -> S K+', 'K+ -> S pi+'])
+    assert(np.all(masses[0][1] == [0.1, 0.5, 1]))
+    assert(np.all(masses[1][1] == [0.1, 0.5, 1]))
+    _assert_widths(br, channels, mS, {'theta': 1})
+    del masses[:]
+    ProductionBranchingRatios(channels[1:], mS, {'theta': 1})
+    assert(np.all(masses[0][1] == [0.1]))
+    # Channels which are closed or invalid for all masses are not evaluated.
+    del masses[:]
+    br = ProductionBranchingRatios(channels, 6., {'theta': 1})
+    assert_equals(masses, [])
+    assert_equals(br.widths['B+ -> S K+'], 0)
+    # Stacked evaluation of the open channels, with a restricted context.
+    couplings = {'theta': 1, 'alpha': 1}
+    mS = np.array([[0.1, 0.3, 0.5, 1], [2.5, 4.9, 6, np.nan]])
+    channels = [TwoBodyHadronic('B+', 'K+'), TwoBodyHadronic('K+', 'pi+'),
+                TwoBodyHadronic('B0', 'pi0')]
+    br = ProductionBranchingRatios(channels, mS, couplings)
+    _assert_widths(br, channels, mS, couplings)
+    channels = [ThreeBodyQuartic('B+', 'K+'), ThreeBodyQuartic('K+', 'pi+'),
+                ThreeBodyQuartic('B0', 'K*0')]
+    br = ProductionBranchingRatios(channels, mS, couplings)
+    _assert_widths(br, channels, mS, couplings, epsilon=1e-14)
+    channels = [TwoGluons(), TwoQuarks('s'), TwoQuarks('c'), TwoPions('charged')]
+    mS = np.array([[0.1, 0.5], [1.5, 2.], [3., 4.], [12., np.nan]])
+    br = DecayBranchingRatios(channels, mS, {'theta': 1})
+    _assert_widths(br, channels, mS, {'theta': 1})
+
+def test_enabled_masks():
+    masses = []
+    channels = [Leptonic('mu'), _counting(TwoGluons, masses)(), TwoPions('charged')]
+    mS = np.array([0.5, 1.5, 2., 3., 4.])
+    heavy = mS > 2
+    enabled = {'S -> g g': heavy, 'S -> pi+ pi-': ~heavy}
+    br = DecayBranchingRatios(channels, mS, {'theta': 1}, enabled=enabled)
+    # Disabled channels are not evaluated, and their width is 0 (instead of NaN).
+    assert_equals(len(masses), 1)
+    assert(np.all(masses[0][1] == [3, 4]))
+    for ch in channels:
+        ref = ch.normalized_width(mS)
+        mask = enabled.get(str(ch), True)
+        assert(np.all(br.widths[str(ch)] == np.where(mask, ref, 0)))
+    assert(np.all(np.isfinite(br.total_width)))
+    # Masks are broadcast to the masses.
+    br = DecayBranchingRatios(channels, 3., {'theta': 1}, enabled={'S -> pi+ pi-': False})
+    assert_equals(br.widths['S -> pi+ pi-'], 0)
+    assert(br.widths['S -> g g'] > 0)
+
+def test_duplicate_masses():
+    masses = []
+    channels = [_counting(TwoBodyHadronic, masses)('B+', 'K+'), TwoQuarks('c'),
+                TwoPions('charged')]
+    mS, theta = np.meshgrid([0.5, 1, 3, 1, 6, np.nan], [1e-3, 0.1, 1], indexing='ij')
+    couplings = {'theta': theta}
+    br = ProductionBranchingRatios(channels[:1], mS, couplings)
+    # The normalized width is only computed once for each distinct mass.
+    assert_equals(len(masses), 1)
+    assert(np.all(np.sort(masses[0][1]) == [0.5, 1, 3]))
+    _assert_widths(br, channels[:1], mS, couplings)
+    br = DecayBranchingRatios(channels[1:], mS, couplings)
+    _assert_widths(br, channels[1:], mS, couplings)
+    # Stacked evaluation of the distinct open masses.
+    mS, theta = np.meshgrid([0.1, 0.3, 2.5, 0.1, 6, 0.3, np.nan, 6], [1e-3, 1], indexing='ij')
+    couplings = {'theta': theta, 'alpha': theta}
+    channels = [TwoBodyHadronic('B+', 'K+'), TwoBodyHadronic('K+', 'pi+')]
+    br = ProductionBranchingRatios(channels, mS, couplings)
+    _assert_widths(br, channels, mS, couplings)
+    channels = [ThreeBodyQuartic('B+', 'K+'), ThreeBodyQuartic('K+', 'pi+')]
+    br = ProductionBranchingRatios(channels, mS, couplings)
+    _assert_widths(br, channels, mS, couplings, epsilon=1e-14)
+    # Channels are enabled for each mass separately, even when duplicated.
+    enabled = np.zeros(mS.shape, dtype='bool')
+    enabled[1,0] = True
+    br = DecayBranchingRatios([TwoPions('charged')], mS, couplings, enabled={'S -> pi+ pi-': enabled})
+    w = br.widths['S -> pi+ pi-']
+    assert(w[1,0] > 0)
+    assert(np.all(w[~enabled] == 0))
@@ -156,6 +156,21 @@ def test_quartic_3body():
     assert_raises(ValueError, lambda: q3.ThreeBodyQuartic('B+', 'e+' ))
     assert_raises(ValueError, lambda: q3.ThreeBodyQuartic('B+', 'K*' ))
     assert_raises(ValueError, lambda: q3.ThreeBodyQuartic('B' , 'K*0'))
+    ch_quad = q3.ThreeBodyQuartic('B+', 'K+', method='quad')
+    assert(np.all(ch_quad.normalized_width(mS) ==
+                  q3.normalized_decay_width('B', 'K', mS, method='quad')))
+    assert_raises(ValueError, lambda: q3.ThreeBodyQuartic('B+', 'K+', method='trapezoid'))
+    ch_tab = q3.ThreeBodyQuartic('B+', 'K+', tabulate=True, table_eps=1e-5)
+    assert(np.all(ch_tab.normalized_width(mS) ==
+                  q3.tabulated_decay_width('B', 'K', mS, table_eps=1e-5)))
+    # Batched evaluation, mixing integration methods and accuracies
+    channels = [ch, ch_quad, ch_tab, q3.ThreeBodyQuartic('B0', 'K*0', eps=1e-6),
+                q3.ThreeBodyQuartic('K_L0', 'pi0', weak_eigenstate='K0')]
+    widths = q3.ThreeBodyQuartic.normalized_widths(channels, mS)
+    assert_equals(len(widths), len(channels))
+    for w, c in zip(widths, channels):
+        w_ref = c.normalized_width(mS)
+        assert(np.all(np.abs(w - w_ref) <= 1e-14 * w_ref))
 
 def test_neutral_kaons():
     ch1 = hh.TwoBodyHadronic('K_L0', 'pi0', weak_eigenstate='K0')
@@ -191,3 +206,63 @@ def test_vectorization():
     mS = [2, 3, 5]
     check_vectorization(gg.TwoGluons()   , mS)
     check_vectorization(qq.TwoQuarks('c'), mS)
+
+def test_kernel_key():
+    assert_equals(hh.TwoBodyHadronic('B+', 'K*+').kernel_key,
+                  hh.TwoBodyHadronic('B0', 'K*0').kernel_key)
+    assert(hh.TwoBodyHadronic('B+', 'K*+').kernel_key !=
+           hh.TwoBodyHadronic('B+', 'K+').kernel_key)
+    assert_equals(q3.ThreeBodyQuartic('B+', 'K+').kernel_key,
+                  q3.ThreeBodyQuartic('B0', 'K0').kernel_key)
+    assert(q3.ThreeBodyQuartic('B+', 'K+').kernel_key !=
+           q3.ThreeBodyQuartic('B+', 'K+', method='quad').kernel_key)
+    assert_equals(kk.TwoKaons('neutral').kernel_key, kk.TwoKaons('charged').kernel_key)
+    assert(kk.TwoKaons('neutral').kernel_key != kk.TwoKaons('neutral', 'pchip').kernel_key)
+    assert_raises(ValueError, lambda: pi.TwoPions('neutral', interpolation='spline'))
+    assert_raises(ValueError, lambda: kk.TwoKaons('neutral', interpolation='spline'))
+    mS = np.array([0.5, 1, 1.5])
+    assert(np.all(kk.TwoKaons('charged', 'pchip').normalized_width(mS) ==
+                  kk.normalized_decay_width(mS, 'pchip')))
+    assert(pi.TwoPions('neutral').kernel_key != pi.TwoPions('charged').kernel_key)
+    assert(hh.TwoBodyHadronic('B+', 'K+').kernel_key != q2.TwoBodyQuartic('B0').kernel_key)
+    channel = hh.TwoBodyHadronic('B+', 'K+')
+    assert_equals(channel.coupling_factor({'theta': 0.5, 'alpha': 2}), 0.25)
+
+def test_interval():
+    mS = np.array([-np.inf, 0, 1, 2, 3, np.inf, np.nan])
+    assert_equals(list(ch.Interval(1, 2, 'left'   ).contains(mS)), [0, 0, 1, 0, 0, 0, 0])
+    assert_equals(list(ch.Interval(1, 2, 'right'  ).contains(mS)), [0, 0, 0, 1, 0, 0, 0])
+    assert_equals(list(ch.Interval(1, 2, 'both'   ).contains(mS)), [0, 0, 1, 1, 0, 0, 0])
+    assert_equals(list(ch.Interval(1, 2, 'neither').contains(mS)), [0, 0, 0, 0, 0, 0, 0])
+    # Infinite bounds are not checked.
+    assert_equals(list(ch.Interval(upper=2).contains(mS)), [1, 1, 1, 0, 0, 0, 0])
+    assert_equals(list(ch.Interval(1).contains(mS)), [0, 0, 0, 1, 1, 1, 0])
+    assert_equals(list(ch.Interval().contains(mS)), 7*[1])
+    assert_equals(ch.Interval().contains(0.5).shape, ())
+    assert_raises(ValueError, lambda: ch.Interval(1, 2, 'open'))
+
+def test_domain():
+    channels = [hh.TwoBodyHadronic('B+', 'K*+'), q2.TwoBodyQuartic('B_s0'),
+                q3.ThreeBodyQuartic('B+', 'K+'), q3.ThreeBodyQuartic('B+', 'pi+', tabulate=True),
+                lp.Leptonic('mu'), pi.TwoPions('charged'), pi.TwoPions('neutral', 'pchip'),
+                kk.TwoKaons('neutral'), mm.Multimeson(), gg.TwoGluons(), qq.TwoQuarks('c')]
+    for channel in channels:
+        # The width is NaN outside of the validity interval, and 0 outside of
+        # the open interval, including around their bounds.
+        mS = [np.nan, -1., 0., 0.5, 1., 3., 6.]
+        for interval in [channel.validity_interval, channel.open_interval]:
+            if interval is not None:
+                for bound in [interval.lower, interval.upper]:
+                    if np.isfinite(bound):
+                        mS += [np.nextafter(bound, -np.inf), bound, np.nextafter(bound, np.inf)]
+        mS = np.array(mS)
+        w = channel.normalized_width(mS)
+        valid = np.ones(mS.shape, dtype='bool')
+        if channel.validity_interval is not None:
+            valid = channel.validity_interval.contains(mS)
+        assert(np.all(np.isnan(w[~valid])))
+        assert(not np.any(np.isnan(w[valid])))
+        if channel.open_interval is not None:
+            assert(np.all(w[valid & ~channel.open_interval.contains(mS)] == 0))
+    assert(ch.DecayChannel.validity_interval.fget(gg.TwoGluons()) is None)
+    assert(ch.DecayChannel.open_interval.fget(gg.TwoGluons()) is None)
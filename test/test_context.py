@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+from nose.tools import assert_equals, assert_raises
+import numpy as np
+
+from ..api.context import EvaluationContext
+from ..api.branching_ratios import DecayBranchingRatios
+from ..decay import two_gluons as gg
+from ..decay import two_quarks as qq
+
+def test_memoize():
+    calls = []
+    def func(mS):
+        calls.append(len(mS))
+        return mS**2
+    mS = np.array([0.5, 1., 2., 3.])
+    context = EvaluationContext(mS)
+    assert(np.all(context.memoize('square', func, mS > 1) == [4, 9]))
+    assert(np.all(context.memoize('square', func, mS > 0.7) == [1, 4, 9]))
+    assert(np.all(context.memoize('square', func) == mS**2))
+    # Each mass is only computed once.
+    assert_equals(calls, [2, 1, 1])
+    assert(np.all(context.memoize('square', func, mS > 0.7) == [1, 4, 9]))
+    assert_equals(calls, [2, 1, 1])
+    assert_equals(len(context.memoize('square', func, mS > 10)), 0)
+    assert_equals(context.memoize('cube', lambda m: m**3, mS > 2).dtype, np.dtype('float'))
+    # Scalar masses
+    context = EvaluationContext(2.)
+    assert(np.all(context.memoize('square', func) == [4]))
+
+def test_shared_context():
+    mS = np.array([1.5, 2., 3., 4., 5., 12.])
+    context = EvaluationContext(mS)
+    w_gg = gg.normalized_decay_width(mS, context)
+    w_s = qq.normalized_decay_width('s', mS, context)
+    w_c = qq.normalized_decay_width('c', mS, context)
+    def same(a, b):
+        return np.all((a == b) | (np.isnan(a) & np.isnan(b)))
+    assert(same(w_gg, gg.normalized_decay_width(mS)))
+    assert(same(w_s, qq.normalized_decay_width('s', mS)))
+    assert(same(w_c, qq.normalized_decay_width('c', mS)))
+    # α_s is shared between all the channels.
+    assert_equals(len([key for key in context._values if key[0] == 'alpha_s']), 1)
+    # The masses must match the context.
+    assert_raises(ValueError, lambda: gg.normalized_decay_width(mS[:3], context))
+    assert_raises(ValueError, lambda: qq.normalized_decay_width('c', 3., context))
+    assert_raises(ValueError, lambda: qq.normalized_total_width(mS[:,np.newaxis], context))
+    assert_raises(ValueError, lambda: gg.normalized_decay_width(mS + 0.5, context))
+    assert_raises(ValueError, lambda: qq.normalized_decay_width('s', mS[::-1], context))
+    br = DecayBranchingRatios([gg.TwoGluons(), qq.TwoQuarks('s'), qq.TwoQuarks('c')],
+                              mS, {'theta': 1})
+    assert(same(br.widths['S -> g g'], w_gg))
+    assert(same(br.widths['S -> c cbar'], w_c))
+    # Equal masses (including NaNs) are accepted.
+    mS = np.array([2.5, np.nan, 3.])
+    context = EvaluationContext(mS)
+    assert(same(gg.normalized_decay_width(list(mS), context), gg.normalized_decay_width(mS)))
+
+def test_restrict():
+    calls = []
+    def func(mS):
+        calls.append(len(mS))
+        return mS**2
+    mS = np.array([[0.5, 1.], [2., 3.]])
+    context = EvaluationContext(mS)
+    restricted = context.restrict(mS > 0.7)
+    assert(np.all(restricted.mass == [1, 2, 3]))
+    assert(np.all(restricted.memoize('square', func, restricted.mass > 1) == [4, 9]))
+    assert(np.all(restricted.memoize('square', func) == [1, 4, 9]))
+    # Memoized quantities are shared with the parent context.
+    assert(np.all(context.memoize('square', func, mS > 1) == [4, 9]))
+    assert(np.all(context.memoize('square', func) == mS.ravel()**2))
+    assert_equals(calls, [2, 1, 1])
+    nested = restricted.restrict(restricted.mass < 3)
+    assert(np.all(nested.mass == [1, 2]))
+    assert(np.all(nested.memoize('square', func) == [1, 4]))
+    assert_equals(calls, [2, 1, 1])
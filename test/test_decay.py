@@ -3,6 +3,9 @@
 from __future__ import absolute_import
 
 from nose.tools import assert_equals, assert_raises
+import os
+import shutil
+import tempfile
 import numpy as np
 
 from ..data.particles import *
@@ -12,6 +15,7 @@ from ..decay import two_kaons as kk
 from ..decay import multimeson as mm
 from ..decay import two_gluons as gg
 from ..decay import two_quarks as qq
+from ..decay import tabulated as tab
 
 def test_leptonic_width():
     eps = 1e-12
@@ -97,6 +101,63 @@ def test_two_kaon_width():
         0, 3.25398123949564e-8, 4.558339609849428e-8, 1.743794584685908e-8])
     assert(np.all(np.abs(w - target) <= eps * target))
 
+def test_tabulated_widths():
+    for module, filename in [(tp, 'winkler_pi.txt'), (kk, 'winkler_K.txt')]:
+        table = np.loadtxt(os.path.join(os.path.dirname(module.__file__), filename))
+        knots = table[table[:,0] <= 2.0]
+        mS = np.concatenate([[0, 0.1, 2.0, 2.001, 2.5, np.nan], knots[:,0]])
+        w_lin = module.normalized_total_width(mS)
+        w_pchip = module.normalized_total_width(mS, 'pchip')
+        for w in [w_lin, w_pchip]:
+            assert(np.all(w[:2] == 0))
+            assert(w[2] > 0)
+            assert(np.all(np.isnan(w[3:6])))
+            # Both methods go through the knots.
+            assert(np.all(np.abs(w[6:] - knots[:,1]) <= 1e-15 * knots[:,1]))
+        # The monotone interpolation does not overshoot the tabulated values.
+        mS = np.linspace(knots[:,0].min(), 2.0, 10001)
+        w = module.normalized_total_width(mS, 'pchip')
+        assert(np.all((w >= 0) & (w <= knots[:,1].max())))
+        assert_raises(ValueError, lambda: module.normalized_total_width(mS, 'cubic'))
+
+def test_table_sidecars():
+    # The sidecars shipped with the package are up to date.
+    for module in [tp, kk]:
+        assert(os.path.exists(tab.sidecar_path(module._table_path, module._upper_lim)))
+    tmpdir = tempfile.mkdtemp(prefix='tables_')
+    try:
+        path = os.path.join(tmpdir, 'table.txt')
+        shutil.copy(tp._table_path, path)
+        ref = tab._prepare_table(np.loadtxt(path), 2.0)
+        sidecar = tab.sidecar_path(path, 2.0)
+        # Missing sidecars are not written when loading the table.
+        table = tab.load_table(path, 2.0)
+        assert(not isinstance(table, np.memmap))
+        assert(np.all(table == ref))
+        assert_equals(os.listdir(tmpdir), ['table.txt'])
+        assert_equals(tab.build_sidecar(path, 2.0), sidecar)
+        table = tab.load_table(path, 2.0)
+        assert(isinstance(table, np.memmap))
+        assert(np.all(table == ref))
+        # The sidecar depends on the upper limit and on the text file.
+        assert(tab.sidecar_path(path, 1.5) != sidecar)
+        with open(path, 'a') as f:
+            f.write('1.9 1e-6\n')
+        assert(tab.sidecar_path(path, 2.0) != sidecar)
+        table = tab.load_table(path, 2.0)
+        assert(not isinstance(table, np.memmap))
+        assert_equals(table.shape, (2, ref.shape[1] + 1))
+        # Corrupted sidecars are ignored, and stale ones are removed by `build_sidecar`.
+        with open(tab.sidecar_path(path, 2.0), 'wb') as f:
+            f.write(b'corrupted')
+        assert(not isinstance(tab.load_table(path, 2.0), np.memmap))
+        tab.build_sidecar(path, 2.0)
+        assert(isinstance(tab.load_table(path, 2.0), np.memmap))
+        assert_equals(sorted(os.listdir(tmpdir)),
+                      sorted(['table.txt', os.path.basename(tab.sidecar_path(path, 2.0))]))
+    finally:
+        shutil.rmtree(tmpdir)
+
 def test_multimeson():
     threshold = 4 * get_mass('pi')
     assert_equals(mm.normalized_decay_width(threshold), 0)
@@ -161,3 +222,43 @@ def test_two_quark_width():
         3.6864436285061025e-6, 0.000014785007585122307])
     assert(np.all(np.abs(w - target) <= eps * target))
     assert_raises(ValueError, lambda: qq.normalized_decay_width('b', mS))
+
+def test_qcd_backends():
+    mS = np.array([0.5, 2.0, 3.0, 4.0, 5.0, 10.0])
+    ref_gg = gg.normalized_decay_width(mS)
+    ref_ss = qq.normalized_decay_width('s', mS)
+    ref_cc = qq.normalized_decay_width('c', mS)
+    try:
+        set_qcd_backend('spline')
+        w_gg = gg.normalized_decay_width(mS)
+        w_ss = qq.normalized_decay_width('s', mS)
+        w_cc = qq.normalized_decay_width('c', mS)
+    finally:
+        set_qcd_backend('rundec')
+    eps = 1e-9
+    for w, ref in [(w_gg, ref_gg), (w_ss, ref_ss), (w_cc, ref_cc)]:
+        assert(np.all(np.isnan(w) == np.isnan(ref)))
+        finite = np.isfinite(ref)
+        assert(np.all(np.abs(w - ref)[finite] <= eps * ref[finite]))
+
+def test_multimeson_matching_coefficient():
+    import os, tempfile
+    C = mm.get_matching_coefficient()
+    assert(C > 0)
+    w = mm.normalized_decay_width(1.)
+    assert_equals(mm.get_matching_coefficient(), C)
+    fd, path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        mm.save_matching_coefficients(path)
+        # A cached value is used instead of recomputing the coefficient.
+        mm.set_matching_coefficient(2*C)
+        assert_equals(mm.normalized_decay_width(1.), 2*w)
+        assert_equals(mm.get_matching_coefficient(), 2*C)
+        mm._matching_coefficients.clear()
+        mm.load_matching_coefficients(path)
+        assert_equals(mm.get_matching_coefficient(), C)
+    finally:
+        os.remove(path)
+        mm._matching_coefficients.clear()
+    assert_equals(mm.get_matching_coefficient(), C)
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+
+from nose.tools import assert_equals, assert_raises
+
+from ..data.files import atomic_write
+
+def test_atomic_write():
+    directory = tempfile.mkdtemp(prefix='atomic_write_')
+    try:
+        path = os.path.join(directory, 'file')
+        with atomic_write(path) as f:
+            f.write(b'first')
+        with atomic_write(path, 'w') as f:
+            f.write('second')
+        with open(path, 'rb') as f:
+            assert_equals(f.read(), b'second')
+        # The file is left untouched, and the temporary file removed, on error.
+        def fail():
+            with atomic_write(path) as f:
+                f.write(b'third')
+                raise(RuntimeError())
+        assert_raises(RuntimeError, fail)
+        with open(path, 'rb') as f:
+            assert_equals(f.read(), b'second')
+        assert_equals(os.listdir(directory), ['file'])
+    finally:
+        shutil.rmtree(directory)
@@ -37,3 +37,31 @@ def test_form_factors_at_zero():
     # Exceptions
     assert_raises(ValueError, lambda: get_form_factor('K', 'B'))
     assert_raises(ValueError, lambda: get_form_factor('B', 'D'))
+
+def test_form_factor_stack():
+    import numpy as np
+    transitions = [('B', 'K'), ('K', 'pi'), ('B', 'K*_0(700)'), ('B', 'K*'),
+                   ('B', 'K*(1410)'), ('B', 'K_1(1270)'), ('B', 'K*_2(1430)')]
+    form_factors = [get_form_factor(*t) for t in transitions]
+    stack = FormFactorStack(form_factors)
+    assert_equals(len(stack), len(transitions))
+    for q2 in [np.linspace(0, 10, 11), np.array(1.), np.ones((2, 3))]:
+        values = stack(q2)
+        assert_equals(values.shape, (len(transitions),) + q2.shape)
+        for F, v in zip(form_factors, values):
+            assert(np.all(v == F(q2)))
+    # Single family
+    stack = FormFactorStack([get_form_factor('B', 'K'), get_form_factor('B', 'pi')])
+    q2 = np.array([0, 1])
+    assert(np.all(stack(q2)[1] == get_form_factor('B', 'pi')(q2)))
+
+def test_form_factor_stack_aligned():
+    import numpy as np
+    form_factors = [get_form_factor('B', 'K'), get_form_factor('B', 'K*'),
+                    get_form_factor('B', 'pi')]
+    stack = FormFactorStack(form_factors)
+    q2 = np.array([[0, 1], [2, 3], [4, 5]])
+    values = stack(q2, aligned=True)
+    assert_equals(values.shape, q2.shape)
+    for F, q2_i, v in zip(form_factors, q2, values):
+        assert(np.all(v == F(q2_i)))
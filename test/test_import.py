@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import os
+import sys
+import subprocess
+
+from nose.tools import assert_equals
+
+# Modules which are slow to import, and should only be loaded on first use.
+_heavy_modules = ['pandas', 'scipy', 'particletools', 'rundec']
+
+def _imported_heavy_modules(statements):
+    """
+    Runs `statements` in a new interpreter, and returns the heavy modules
+    which have been imported.
+    """
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    package = __name__.split('.')[0]
+    code = '\n'.join(
+        ['import sys'] +
+        [st.format(package=package) for st in statements] +
+        ['print(" ".join(m for m in {!r} if m in sys.modules))'.format(_heavy_modules)])
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [os.path.dirname(package_dir)] + env.get('PYTHONPATH', '').split(os.pathsep))
+    output = subprocess.check_output([sys.executable, '-c', code], env=env)
+    return output.decode().split()
+
+def test_lazy_import():
+    assert_equals(_imported_heavy_modules(['import {package}']), [])
+
+def test_lazy_multimeson():
+    # The matching coefficient of the multimeson channel should only be
+    # computed (using rundec) when the channel is evaluated.
+    imported = _imported_heavy_modules([
+        'from {package}.decay.multimeson import Multimeson',
+        'ch = Multimeson()',
+        'str(ch)',
+    ])
+    assert('rundec' not in imported)
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+from nose.tools import assert_equals, assert_raises
+
+from ..data.lru_cache import LRUCache, CacheInfo
+
+def test_lru_cache():
+    c = LRUCache(maxsize=2)
+    c.insert('a', 1)
+    c.insert('b', 2)
+    assert_equals(c.lookup('a'), 1)
+    # 'b' is now the least recently used entry.
+    c.insert('c', 3)
+    assert('b' not in c)
+    assert('a' in c and 'c' in c)
+    assert_raises(KeyError, lambda: c.lookup('b'))
+    assert_equals(c.info(), CacheInfo(hits=1, misses=1, maxsize=2, currsize=2))
+    assert_equals(c.get_or_compute('d', lambda: 4), 4)
+    assert_equals(c.get_or_compute('d', lambda: 5), 4)
+    assert_equals((c.hits, c.misses, c.maxsize, len(c)), (2, 2, 2, 2))
+    c.clear()
+    assert_equals(c.info(), CacheInfo(hits=0, misses=0, maxsize=2, currsize=0))
+    assert_raises(ValueError, lambda: LRUCache(maxsize=-1))
+
+def test_unbounded_and_disabled():
+    c = LRUCache(maxsize=None)
+    for i in range(1000):
+        c.insert(i, i)
+    assert_equals(len(c), 1000)
+    c = LRUCache(maxsize=0)
+    c.insert('a', 1)
+    assert_equals(len(c), 0)
@@ -8,6 +8,7 @@ import numpy as np
 from ..api.model import Model
 from ..api.branching_ratios import BranchingRatiosResult
 from ..data.constants import default_scalar_id
+from ..data import constants as cst
 
 def test_model():
     m = Model()
@@ -69,3 +70,114 @@ def test_toy_model_matching():
     res_high = m.compute_branching_ratios(Lambda, theta=1, alpha=0)
     eps = 1e-8
     assert(abs(res_low.total_width - res_high.total_width) <= eps * res_high.total_width)
+
+def test_auto_decay_mode():
+    m = Model(decay_mode='auto')
+    assert_equals(m.decay_mode, 'auto')
+    m.production.enable('B -> S K?')
+    m_light, m_heavy = Model(), Model()
+    m_light.decay.enable('LightScalar')
+    m_heavy.decay.enable('HeavyScalar')
+    mS = np.array([0.1, 0.5, 1., 2., 2.5, 4., 5.])
+    light = mS <= 2
+    res = m.compute_branching_ratios(mS, theta=1e-3)
+    res_light = m_light.compute_branching_ratios(mS, theta=1e-3)
+    res_heavy = m_heavy.compute_branching_ratios(mS, theta=1e-3)
+    assert(np.all(res.total_width ==
+                  np.where(light, res_light.total_width, res_heavy.total_width)))
+    for st, br in res.decay.branching_ratios.items():
+        ref_light = res_light.decay.branching_ratios.get(st, np.zeros_like(mS))
+        ref_heavy = res_heavy.decay.branching_ratios.get(st, np.zeros_like(mS))
+        assert(np.all(br == np.where(light, ref_light, ref_heavy)))
+    assert(np.all(np.isfinite(res.lifetime_si)))
+    # The total width is continuous across the boundary.
+    w_below, w_above = m.compute_branching_ratios(
+        np.array([2., np.nextafter(2., 3.)]), theta=1).total_width
+    assert(abs(w_above - w_below) <= 1e-8 * w_below)
+    # For a single mass, only the channels of its regime are used.
+    assert_equals(set(m.compute_branching_ratios(1., theta=1).decay.widths),
+                  set(m_light.decay.list_enabled()))
+    assert_equals(set(m.compute_branching_ratios(3., theta=1).decay.widths),
+                  set(m_heavy.decay.list_enabled()))
+    # Scans
+    res = m.scan_branching_ratios(mS, theta=[1e-3, 1])
+    assert(np.all(res.total_width[:,0] ==
+                  m.compute_branching_ratios(mS, theta=1e-3).total_width))
+    # The selection of decay channels is ignored.
+    m.decay.enable('S -> tau+ tau-')
+    assert_equals(m.compute_branching_ratios(1., theta=1).total_width,
+                  res_light.total_width[2] / 1e-3**2)
+    assert_raises(ValueError, lambda: Model(decay_mode='light'))
+
+def test_scan():
+    m = Model()
+    m.production.enable_all()
+    m.decay.enable('LightScalar')
+    mS = np.array([0.1, 0.5, 1, 1.5])
+    theta = np.array([1e-5, 1e-3, 0.25])
+    res = m.scan_branching_ratios(mS, theta=theta, alpha=0.5)
+    ref = m.compute_branching_ratios(mS[:,np.newaxis], theta=theta[np.newaxis,:], alpha=0.5)
+    assert_equals(res.total_width.shape, (4, 3))
+    assert(np.all(res.total_width == ref.total_width))
+    for st, br in res.production.branching_ratios.items():
+        assert_equals(br.shape, (4, 3))
+        assert(np.all(br == ref.production.branching_ratios[st]))
+    for st, br in res.decay.branching_ratios.items():
+        assert(np.all((br == ref.decay.branching_ratios[st]) | np.isnan(br)))
+    # Couplings are sorted by name.
+    alpha = np.array([0, 1])
+    res2 = m.scan_branching_ratios(mS, {'theta': theta, 'alpha': alpha})
+    assert_equals(res2.total_width.shape, (4, 2, 3))
+    res3 = m.scan_branching_ratios(1., theta=theta, alpha=0)
+    assert_equals(res3.total_width.shape, (3,))
+    assert_raises(ValueError, lambda: m.scan_branching_ratios(mS[:,np.newaxis], theta=1, alpha=0))
+    assert_raises(ValueError, lambda: m.scan_branching_ratios(mS, 1))
+
+def test_memo():
+    m = Model(memo_size=2)
+    m.decay.enable('LightScalar')
+    m.production.enable('B -> S K?')
+    res = m.compute_branching_ratios([0.5, 1.], theta=1e-3)
+    assert(m.compute_branching_ratios(np.array([0.5, 1.]), theta=1e-3) is res)
+    assert(m.compute_branching_ratios([0.5, 1.], {'theta': 1e-3}) is res)
+    assert_equals(m.memo_info().hits, 2)
+    # Different arguments
+    assert(m.compute_branching_ratios([0.5, 1.], theta=2e-3) is not res)
+    assert(m.compute_branching_ratios([0.5, 1.], theta=1e-3, ignore_invalid=True) is not res)
+    # Capacity
+    assert(m.compute_branching_ratios([0.5, 1.], theta=1e-3) is not res)
+    assert_equals(m.memo_info().currsize, 2)
+    # Changing the selection invalidates the memo
+    res = m.compute_branching_ratios(0.5, theta=1e-3)
+    m.production.disable('B -> S K?')
+    res2 = m.compute_branching_ratios(0.5, theta=1e-3)
+    assert(res2 is not res)
+    assert_equals(len(res2.production.branching_ratios), 0)
+    assert_equals(m.memo_info().currsize, 1)
+    m.production.disable('B -> S K?') # No change
+    assert(m.compute_branching_ratios(0.5, theta=1e-3) is res2)
+    m.clear_memo()
+    assert_equals(m.memo_info().currsize, 0)
+    # Changing the decay mode
+    res = m.compute_branching_ratios(3., theta=1e-3)
+    m.decay_mode = 'auto'
+    assert(np.isfinite(m.compute_branching_ratios(3., theta=1e-3).total_width))
+    assert(np.isnan(res.total_width))
+    # Changing a constant
+    m.decay_mode = 'manual'
+    res = m.compute_branching_ratios(1.5, theta=1e-3)
+    alpha_s_MZ = cst.alpha_s_MZ
+    try:
+        cst.alpha_s_MZ = 0.125
+        res2 = m.compute_branching_ratios(1.5, theta=1e-3)
+        assert(res2 is not res)
+        assert(res2.total_width != res.total_width)
+        assert(m.compute_branching_ratios(1.5, theta=1e-3) is res2)
+    finally:
+        cst.alpha_s_MZ = alpha_s_MZ
+    assert(m.compute_branching_ratios(1.5, theta=1e-3) is res)
+    # Disabled by default
+    m = Model()
+    assert(m.compute_branching_ratios(0.5, theta=1e-3) is not
+           m.compute_branching_ratios(0.5, theta=1e-3))
+    assert_raises(ValueError, lambda: Model(memo_size=2).compute_branching_ratios(0.5, 1))
@@ -3,6 +3,7 @@
 from __future__ import absolute_import
 
 from nose.tools import assert_equals, assert_raises
+import numpy as np
 
 from ..data.particles import *
 from ..data.constants import *
@@ -167,6 +168,28 @@ def test_alpha_s():
     assert(abs(alpha_s(500., 6) - 0.095273  ) < 5e-6)
     assert_equals(alpha_s(M_Z, 5), alpha_s_MZ)
 
+def test_qcd_backend():
+    mu = np.array([2., 3., 5., 10.])
+    ref = alpha_s(mu, 4)
+    assert_equals(get_qcd_backend(), 'rundec')
+    try:
+        set_qcd_backend('spline')
+        assert_equals(get_qcd_backend(), 'spline')
+        w = alpha_s(mu, 4)
+        assert(np.all(np.abs(w / ref - 1) <= 1e-10))
+        assert_equals(alpha_s(3., 4).shape, ())
+        for q, nf in [('s', 3), ('s', 4), ('c', 4), ('c', 5), ('b', 5)]:
+            w = msbar_mass(q, mu, nf)
+            set_qcd_backend('rundec')
+            ref = msbar_mass(q, mu, nf)
+            set_qcd_backend('spline')
+            assert(np.all(np.abs(w / ref - 1) <= 1e-10))
+        assert_raises(ValueError, lambda: msbar_mass('t', mu, 6))
+        assert_raises(ValueError, lambda: msbar_mass('c', mu, 7))
+    finally:
+        set_qcd_backend('rundec')
+    assert_raises(ValueError, lambda: set_qcd_backend('wilson'))
+
 def test_on_shell_mass():
     assert_raises(ValueError, lambda: on_shell_mass('u'))
     assert_raises(ValueError, lambda: on_shell_mass('d'))
@@ -201,3 +224,26 @@ def test_scale_invariant_mass():
     assert(abs(scale_invariant_mass('c') -   1.28) <  0.05)
     assert(abs(scale_invariant_mass('b') -   4.18) <  0.05)
     assert(abs(scale_invariant_mass('t') - 174.0 ) < 15.  )
+
+def test_meson_records():
+    # The indexed records must reproduce the data file.
+    import os
+    import pandas
+    from ..data import particles
+    df = pandas.read_csv(os.path.join(particles._srcdir, 'meson_properties.dat'),
+                         delim_whitespace=True)
+    index = particles._get_meson_index()
+    assert_equals(len(index.by_name), len(df))
+    for row in df.itertuples(index=False):
+        record = index.by_name[row.Name]
+        for field in record._fields:
+            value, expected = getattr(record, field), getattr(row, field)
+            # Missing quantum numbers are NaN.
+            assert(value == expected or (np.isnan(value) and np.isnan(expected)))
+        assert(index.by_id[row.IdZero] is record)
+    assert_equals(get_mass('K*+'), get_mass('K*'))
+    assert_equals(get_mass('K_L0'), get_mass('K'))
+    assert_equals(get_spin_code('K*_2(1430)0'), 5)
+    assert_equals(get_parity('K_1(1400)+'), +1)
+    assert_equals(get_abs_strangeness('B_s0'), 1)
+    assert_raises(ValueError, lambda: get_mass('X(3872)0'))
@@ -198,3 +198,79 @@ def test_three_body_quartic_width():
         1.6612014059946842e-23, 8.953536899181432e-24, 1.685067040498652e-27, 0])
     assert(np.all(np.isfinite(w)))
     assert(np.all(np.abs(w - target) <= eps * np.max(target)))
+
+def test_three_body_quartic_integration_methods():
+    mS = np.array([0, 0.05, 0.5, 1, 2, 2.3, 2.5])
+    for X1 in ['K', 'K*', 'K_1(1270)', 'K*_2(1430)']:
+        for eps in [1e-3, 1e-8]:
+            w_gauss = q3.normalized_decay_width('B', X1, mS, eps=eps, method='gauss')
+            w_quad  = q3.normalized_decay_width('B', X1, mS, eps=1e-12, method='quad')
+            assert(np.all(w_gauss[w_quad == 0] == 0))
+            assert(np.all(np.abs(w_gauss - w_quad) <= eps * w_quad))
+    assert_equals(q3.normalized_decay_width('B', 'K', 1.).shape, ())
+    assert_raises(ValueError, lambda: q3.normalized_decay_width('B', 'K', mS, method='simpson'))
+
+def test_three_body_quartic_tables():
+    for X1 in ['K', 'K*_0(700)']:
+        closing_mass = (get_mass('B') - get_mass(X1)) / 2
+        mS = np.concatenate([np.linspace(0, 1.01*closing_mass, 50),
+                             [closing_mass * (1 - 1e-8)]])
+        w_tab = q3.tabulated_decay_width('B', X1, mS, eps=1e-9, table_eps=1e-6)
+        w_ref = q3.normalized_decay_width('B', X1, mS, eps=1e-9)
+        assert(np.all(w_tab[w_ref == 0] == 0))
+        assert(np.all(np.abs(w_tab - w_ref) <= 1e-6 * w_ref))
+    # Tables are built once per set of parameters.
+    assert(q3.get_width_table('B', 'K') is q3.get_width_table('B', 'K'))
+    assert(q3.get_width_table('B', 'K').n_knots <= 512)
+    assert_equals(q3.tabulated_decay_width('B', 'K', 1.).shape, ())
+    assert_raises(ValueError, lambda: q3.get_width_table('K', 'B'))
+
+def test_transition_kernel():
+    kernel = hc.get_transition_kernel('B', 'K*')
+    assert(hc.get_transition_kernel('B', 'K*') is kernel)
+    assert_equals(kernel.mX , get_mass('B' ))
+    assert_equals(kernel.mX1, get_mass('K*'))
+    assert_equals(kernel.xi , hc._get_xi('B', 'K*'))
+    q2 = np.array([0, 1, 4])
+    assert(np.all(kernel.M(q2) == hc.get_matrix_element('B', 'K*')(q2)))
+    assert_raises(ValueError, lambda: hc.get_transition_kernel('B', 'D'))
+
+def _check_stacked_kernels_bounded(module, transitions):
+    # Only the most recently used stacks are kept
+    maxsize = module._stacked_kernels.maxsize
+    for i in range(maxsize + 1):
+        module.get_stacked_kernels((i + 1) * transitions[:1])
+    assert_equals(len(module._stacked_kernels), maxsize)
+
+def test_stacked_two_body_hadronic():
+    transitions = [('K', 'pi'), ('B', 'pi'), ('B', 'K'), ('B', 'K*'),
+                   ('B', 'K_1(1270)'), ('B', 'K*_0(700)'), ('B', 'K*_2(1430)'),
+                   ('B', 'K*(1410)')]
+    stacked = hh.get_stacked_kernels(transitions)
+    assert(hh.get_stacked_kernels(transitions) is stacked)
+    _check_stacked_kernels_bounded(hh, transitions)
+    for mS in [np.linspace(0, 6, 101), np.array(1.), np.ones((2, 3))]:
+        w = stacked(mS)
+        assert_equals(w.shape, (len(transitions),) + mS.shape)
+        for w_i, (Y, Y1) in zip(w, transitions):
+            # Bit-compatible with the per-channel evaluation
+            assert(np.all(w_i == hh.normalized_decay_width(Y, Y1, mS)))
+
+def test_stacked_three_body_quartic():
+    transitions = [('K', 'pi'), ('B', 'pi'), ('B', 'K'), ('B', 'K*'),
+                   ('B', 'K_1(1270)'), ('B', 'K*_0(700)'), ('B', 'K*_2(1430)')]
+    eps = 1e-6
+    stacked = q3.get_stacked_kernels(transitions)
+    assert(q3.get_stacked_kernels(transitions) is stacked)
+    _check_stacked_kernels_bounded(q3, transitions)
+    # Small chunks along the mass axis
+    kernels = [hc.get_transition_kernel(X, X1) for X, X1 in transitions]
+    chunked = q3.StackedKernels(kernels, max_nodes=100)
+    for mS in [np.linspace(0, 2.7, 31), np.array(1.), np.ones((2, 3))]:
+        w = stacked(mS, eps)
+        assert_equals(w.shape, (len(transitions),) + mS.shape)
+        assert(np.all(chunked(mS, eps) == w))
+        for w_i, (X, X1) in zip(w, transitions):
+            w_ref = q3.normalized_decay_width(X, X1, mS, eps=eps)
+            assert(np.all(w_i[w_ref == 0] == 0))
+            assert(np.all(np.abs(w_i - w_ref) <= 1e-14 * w_ref))
@@ -25,10 +25,11 @@
 # Minor modifications by Jean-Loup Tastet (2019-02-08):
 # * Copy license to source file.
 # * Fix import path.
+# * Test the shared evaluators.
 
 from __future__ import absolute_import
 import unittest
-from ..data.qcd import alpha_s, m_b, m_c, m_s
+from ..data.qcd import alpha_s, m_b, m_c, m_s, QCDEvaluator, get_evaluator
 
 # All numbers compared to Mathemetica version of RunDec
 
@@ -185,3 +186,44 @@ class TestAlphas(unittest.TestCase):
         self.assertAlmostEqual(alpha_s(1000, 3),
                                0.076593079980776995496,
                                delta=delta)
+
+
+class TestEvaluator(unittest.TestCase):
+    def test_shared_evaluator(self):
+        ev = get_evaluator(alphasMZ=0.1181, loop=5)
+        self.assertIs(ev, get_evaluator(alphasMZ=0.1181, loop=5))
+        self.assertIsNot(ev, get_evaluator(alphasMZ=0.1181, loop=4))
+        self.assertEqual(ev.alphasMZ, 0.1181)
+        self.assertEqual(ev.loop, 5)
+
+    def test_cache(self):
+        ev = QCDEvaluator(alphasMZ=0.1181, loop=5, cache_size=2)
+        ref = alpha_s(3, 4, alphasMZ=0.1181, loop=5)
+        self.assertEqual(ev.alpha_s(3, 4), ref)
+        self.assertEqual(ev.cache_info().misses, 1)
+        self.assertEqual(ev.alpha_s(3, 4), ref)
+        self.assertEqual(ev.cache_info().hits, 1)
+        ev.m_s(0.095, 2.5, 4)
+        ev.m_c(1.279, 2, 4)
+        info = ev.cache_info()
+        self.assertEqual(info.maxsize, 2)
+        self.assertEqual(info.currsize, 2)
+        ev.clear_cache()
+        self.assertEqual(ev.cache_info().currsize, 0)
+        # Errors are not cached
+        with self.assertRaises(ValueError):
+            ev.alpha_s(0.5, 3)
+        with self.assertRaises(ValueError):
+            ev.alpha_s(0.5, 3)
+        self.assertEqual(ev.cache_info().currsize, 0)
+
+    def test_reused_instance(self):
+        # Interleaving calls must not leak state between them through the
+        # shared CRunDec instance.
+        ev = QCDEvaluator(alphasMZ=0.1181, loop=5, cache_size=0)
+        self.assertAlmostEqual(ev.m_b(4.163, 1, 3), 6.55283, delta=deltam)
+        self.assertAlmostEqual(ev.alpha_s(500, 6), 0.095272906877950202894, delta=delta)
+        self.assertAlmostEqual(ev.m_s(0.095, 50, 5), 0.05750, delta=deltam)
+        self.assertAlmostEqual(ev.alpha_s(0.9, 3), 0.517328, delta=1e-5)
+        self.assertAlmostEqual(ev.m_c(1.279, 50, 5), 0.66840, delta=deltam)
+        self.assertAlmostEqual(ev.m_b(4.163, 200, 6), 2.67213, delta=deltam)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+from nose.tools import assert_equals, assert_raises
+import numpy as np
+
+from ..data import running
+from ..data import qcd
+
+def test_spline_table():
+    table = running.SplineTable(lambda mu: mu**2 + 1, mu_min=1, mu_max=10, rtol=1e-8)
+    mu = np.array([1., 1.5, 3.7, 10.])
+    assert(np.all(np.abs(table(mu) / (mu**2 + 1) - 1) < 1e-8))
+    assert(table.max_rel_error < 1e-8)
+    assert(table.n_knots > 0)
+    assert_equals(table.domain, (1, 10))
+    # Outside the table, the function is evaluated directly.
+    mu = np.array([0.5, 20.])
+    assert(np.all(table(mu) == mu**2 + 1))
+    assert_equals(table(2.).shape, ())
+    assert_raises(ValueError, lambda: running.SplineTable(lambda mu: mu, mu_min=0, mu_max=1))
+    assert_raises(ValueError, lambda: running.SplineTable(lambda mu: mu, mu_min=2, mu_max=1))
+    # Vectorized functions are evaluated on arrays, and the table size is bounded.
+    table = running.SplineTable(lambda mu: 2 + np.sin(mu), rtol=1e-15,
+                                max_knots=100, vectorized=True)
+    assert(table.n_knots <= 100)
+    assert_raises(ValueError, lambda: running.SplineTable(np.sqrt, max_knots=16))
+
+def test_alpha_s():
+    rng = np.random.RandomState(42)
+    mu = np.exp(rng.uniform(np.log(running.default_mu_min),
+                            np.log(running.default_mu_max), 200))
+    # Stay away from the matching scale of the nf=3 theory, where CRunDec is
+    # not continuous.
+    mu = mu[np.abs(mu - 1.3) > 1e-3]
+    for nf in [3, 4, 5, 6]:
+        w = running.alpha_s(mu, nf, alphasMZ=0.1181, loop=5)
+        ref = np.array([qcd.alpha_s(_mu, nf, alphasMZ=0.1181, loop=5) for _mu in mu])
+        assert(np.all(np.abs(w / ref - 1) <= running.default_rtol))
+    # Tables are built once per set of parameters.
+    assert(running.get_alpha_s_table(4, 0.1181, 5) is running.get_alpha_s_table(4, 0.1181, 5))
+    assert(running.get_alpha_s_table(4, 0.1181, 5) is not running.get_alpha_s_table(4, 0.1181, 4))
+    assert_raises(ValueError, lambda: running.alpha_s(2., 7, alphasMZ=0.1181, loop=5))
+    assert_raises(ValueError, lambda: running.alpha_s(0.01, 4, alphasMZ=0.1181, loop=5))
+
+def test_msbar_mass():
+    mu = np.array([1.5, 2., 3.1, 4.9, 10., 91.])
+    for q, m_ref, m_q in [('s', 0.0938, qcd.m_s), ('c', 1.28, qcd.m_c), ('b', 4.18, qcd.m_b)]:
+        w = running.msbar_mass(q, m_ref, mu, 4, alphasMZ=0.1181, loop=5)
+        ref = np.array([m_q(m_ref, _mu, 4, alphasMZ=0.1181, loop=5) for _mu in mu])
+        assert(np.all(np.abs(w / ref - 1) <= running.default_rtol))
+    assert_raises(ValueError, lambda: running.msbar_mass('t', 173., mu, 6, alphasMZ=0.1181, loop=5))
+    assert_raises(ValueError, lambda: running.msbar_mass('c', 1.28, mu, 2, alphasMZ=0.1181, loop=5))
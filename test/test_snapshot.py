@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import os
+import pickle
+import tempfile
+import warnings
+
+from nose.tools import assert_equals
+import numpy as np
+
+from ..data import snapshot
+from ..data import particles
+
+def _same(a, b):
+    # Missing quantum numbers are NaN.
+    return a == b or (np.isnan(a) and np.isnan(b))
+
+def test_snapshot_consistency():
+    # The snapshot shipped with the package must be up to date with the source
+    # files. Otherwise, rebuild it with `python -m scalar_portal.data.snapshot`.
+    saved = snapshot.load_snapshot()
+    assert(saved is not None)
+    built = snapshot.build_snapshot()
+    assert_equals(saved['source_hash'], built['source_hash'])
+    assert_equals(len(saved['mesons']), len(built['mesons']))
+    for saved_record, built_record in zip(saved['mesons'], built['mesons']):
+        assert(all(_same(a, b) for a, b in zip(saved_record, built_record)))
+    assert_equals(saved['generic'], built['generic'])
+    assert_equals(saved['particletools_version'], built['particletools_version'])
+
+def test_stale_snapshot():
+    fd, path = tempfile.mkstemp(suffix='.snapshot')
+    os.close(fd)
+    try:
+        for field in ['source_hash', 'particletools_version']:
+            stale = snapshot.load_snapshot()
+            stale[field] = 'stale'
+            with open(path, 'wb') as f:
+                pickle.dump(stale, f, protocol=2)
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter('always')
+                assert(snapshot.load_snapshot(path) is None)
+                assert_equals(len(w), 1)
+    finally:
+        os.remove(path)
+    assert(snapshot.load_snapshot(path) is None)
+
+def test_source_fallback():
+    # The particle properties do not depend on whether they are read from the
+    # snapshot or from the source files.
+    names = ['K+', 'K_L0', 'K*(1410)bar0', 'B_s0', 'D+', 'e-', 'mu+', 'cbar', 'g']
+    def properties():
+        return [get(name) for name in names
+                for get in [particles.get_mass, particles.get_pdg_id]]
+    from_snapshot = properties()
+    saved = particles._snapshot, particles._meson_index
+    try:
+        particles._snapshot, particles._meson_index = False, None
+        from_sources = properties()
+    finally:
+        particles._snapshot, particles._meson_index = saved
+    assert_equals(from_snapshot, from_sources)
+
+def test_stale_generic():
+    # Particles missing from the snapshot are looked up in the PYTHIA database,
+    # which is then checked against the generic particles of the snapshot.
+    stale = dict(snapshot.load_snapshot())
+    assert(snapshot.check_generic(stale, particles._get_pdata()))
+    stale['generic'] = dict(stale['generic'], g=(21, 1.))
+    saved = particles._snapshot, particles._pdata
+    try:
+        particles._snapshot, particles._pdata = stale, None
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            assert_equals(particles.get_pdg_id('p+'), 2212)
+            # Loading the PYTHIA database may emit other (e.g. resource) warnings.
+            assert_equals(len([x for x in w if issubclass(x.category, UserWarning)]), 1)
+        # The stale generic particles are not used anymore.
+        assert_equals(particles.get_mass('g'), particles._get_pdata().mass('g'))
+    finally:
+        particles._snapshot, particles._pdata = saved
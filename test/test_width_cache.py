@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+
+from nose.tools import assert_equals, assert_raises
+import numpy as np
+
+from ..api.width_cache import WidthCache
+from ..api.branching_ratios import ProductionBranchingRatios
+from ..api.model import Model
+from ..data import constants as cst
+from ..production.two_body_hadronic import TwoBodyHadronic
+from ..production.three_body_quartic import ThreeBodyQuartic
+
+def _make_cache(**kwargs):
+    return WidthCache(tempfile.mkdtemp(prefix='width_cache_'), **kwargs)
+
+def test_lookup_insert():
+    cache = _make_cache()
+    try:
+        mS = np.array([0.1, 0.5, 1])
+        key = (TwoBodyHadronic, 'B', 'K')
+        assert_raises(KeyError, lambda: cache.lookup(key, mS))
+        cache.insert(key, mS, [1., 2., 3.])
+        assert_equals(len(cache), 1)
+        assert(np.all(cache.lookup(key, mS) == [1, 2, 3]))
+        # Different masses, kernel or inputs
+        assert_raises(KeyError, lambda: cache.lookup(key, mS[:2]))
+        assert_raises(KeyError, lambda: cache.lookup(key, mS.reshape(3, 1)))
+        assert_raises(KeyError, lambda: cache.lookup((TwoBodyHadronic, 'B', 'pi'), mS))
+        v = cst.v
+        try:
+            cst.v = 2*v
+            assert_raises(KeyError, lambda: cache.lookup(key, mS))
+        finally:
+            cst.v = v
+        # Corrupted entries are ignored
+        path, = [os.path.join(cache.directory, name)
+                 for name in os.listdir(cache.directory) if name.endswith('.npz')]
+        with open(path, 'wb') as f:
+            f.write(b'corrupted')
+        assert_raises(KeyError, lambda: cache.lookup(key, mS))
+        cache.clear()
+        assert_equals(len(cache), 0)
+    finally:
+        shutil.rmtree(cache.directory)
+    assert_raises(ValueError, lambda: WidthCache(cache.directory, max_size=-1))
+
+def test_eviction():
+    cache = _make_cache()
+    try:
+        mS = np.linspace(0, 1, 1000)
+        cache.insert('a', mS, mS)
+        entry_size = cache.size()
+        cache = WidthCache(cache.directory, max_size=int(2.5*entry_size))
+        cache.insert('b', mS, mS)
+        # Make sure 'a' is more recent than 'b'
+        os.utime(os.path.join(cache.directory, cache._key('b', mS) + '.npz'), (0, 0))
+        cache.lookup('a', mS)
+        cache.insert('c', mS, mS)
+        assert_equals(len(cache), 2)
+        assert_raises(KeyError, lambda: cache.lookup('b', mS))
+        cache.lookup('a', mS)
+        cache.lookup('c', mS)
+    finally:
+        shutil.rmtree(cache.directory)
+
+def test_cached_branching_ratios():
+    cache = _make_cache()
+    try:
+        channels = [TwoBodyHadronic('B+', 'K+'), TwoBodyHadronic('B0', 'K0'),
+                    ThreeBodyQuartic('B+', 'K+'), ThreeBodyQuartic('B+', 'K+', eps=1e-6)]
+        mS = np.array([0.1, 0.5, 1, 2])
+        couplings = {'theta': 0.5, 'alpha': 0.1}
+        ref = ProductionBranchingRatios(channels, mS, couplings)
+        br1 = ProductionBranchingRatios(channels, mS, couplings, width_cache=cache)
+        assert_equals(len(cache), 3)
+        br2 = ProductionBranchingRatios(channels, mS, couplings, width_cache=cache)
+        assert_equals(len(cache), 3)
+        for ch in channels:
+            assert(np.all(br1.widths[str(ch)] == ref.widths[str(ch)]))
+            assert(np.all(br2.widths[str(ch)] == ref.widths[str(ch)]))
+        # The cache is shared between instances
+        m = Model(width_cache=WidthCache(cache.directory))
+        res = m.compute_branching_ratios(0.5, theta=1, alpha=0)
+        n_entries = len(cache)
+        assert(np.isfinite(m.compute_branching_ratios(0.5, theta=1, alpha=0).total_width))
+        assert_equals(len(cache), n_entries)
+        assert_equals(m.compute_branching_ratios(0.5, theta=1, alpha=0).total_width,
+                      res.total_width)
+    finally:
+        shutil.rmtree(cache.directory)